@@ -0,0 +1,74 @@
+"""
+Gunicorn settings for production: ``gunicorn`` picks this file up from the
+working directory, so the start command is just ``gunicorn``.
+
+Every value can be overridden through the environment (GUNICORN_*), e.g.
+GUNICORN_WORKERS=4 on a host where os.cpu_count() reports more CPUs than the
+container is allowed to use.
+"""
+
+import os
+import subprocess
+import sys
+
+wsgi_app = "myproject.wsgi:application"
+bind = os.environ.get("GUNICORN_BIND", f"0.0.0.0:{os.environ.get('PORT', '8000')}")
+
+# Import Django and the project once in the master; workers fork from it and
+# share those pages copy-on-write instead of each importing everything again.
+preload_app = True
+
+# One process per CPU for Python work, a few threads each to overlap database
+# and file I/O (the GIL is released while waiting).
+worker_class = "gthread"
+workers = int(os.environ.get("GUNICORN_WORKERS", max(2, os.cpu_count() or 1)))
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+
+# Recycle workers now and then to cap slow memory growth; the jitter keeps
+# them from all restarting (and warming up) at the same moment.
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 2000))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", 200))
+
+timeout = 30
+graceful_timeout = 30
+keepalive = 5
+
+accesslog = "-"
+errorlog = "-"
+
+
+def when_ready(server):
+    from myapp.warmup import enable_wal
+
+    enable_wal()
+    # Refresh the read snapshot (myapp/snapshot.py) from a separate process, so
+    # the master never holds an SQLite handle that workers would inherit.
+    server.snapshot_refresher = subprocess.Popen(
+        [sys.executable, "manage.py", "refresh_snapshot", "--loop"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+
+
+def on_exit(server):
+    refresher = getattr(server, "snapshot_refresher", None)
+    if refresher is not None:
+        refresher.terminate()
+        refresher.wait(timeout=10)
+
+
+def pre_fork(server, worker):
+    # Nothing opened in the master may be inherited: a forked SQLite handle is
+    # not safe to share between processes.
+    from django.db import connections
+
+    connections.close_all()
+
+
+def post_fork(server, worker):
+    from myapp.warmup import warm_up
+
+    try:
+        warm_up()
+    except Exception:
+        # A cold worker is slower, not broken; keep serving.
+        server.log.exception("Worker warm-up failed")
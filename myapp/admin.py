@@ -1,6 +1,178 @@
+import io
+import pstats
+
+from django.conf import settings
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Max
+from django.utils.functional import cached_property
+from django.utils.html import format_html
+
 from .models import *
-# Register your models here.
-admin.site.register(Project)
-admin.site.register(ProjectImage)
-admin.site.register(Profile)
\ No newline at end of file
+
+
+# ---------------- LARGE TABLE SUPPORT ----------------
+
+ESTIMATE_THRESHOLD = 10000  # below this an exact COUNT(*) is cheap enough
+FILTERED_COUNT_CAP = 10000  # filtered changelists count at most this many rows
+
+
+def estimated_row_count(model):
+    """Cheap row-count estimate from planner statistics (or the primary key index)."""
+    connection = connections[model.objects.db]
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE relname = %s", [table])
+            row = cursor.fetchone()
+            if row and row[0] > 0:
+                return row[0]
+        elif connection.vendor == "mysql":
+            cursor.execute(
+                "SELECT table_rows FROM information_schema.tables WHERE table_schema = DATABASE() AND table_name = %s",
+                [table],
+            )
+            row = cursor.fetchone()
+            if row and row[0]:
+                return row[0]
+    # SQLite has no maintained estimate; MAX(pk) is an index lookup and close enough
+    # for tables that are mostly appended to.
+    return model.objects.aggregate(highest=Max("pk"))["highest"] or 0
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Avoids exact COUNT(*) over big tables: unfiltered lists use an estimate,
+    filtered lists count at most FILTERED_COUNT_CAP rows.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimated_row_count(queryset.model)
+            if estimate > ESTIMATE_THRESHOLD:
+                return estimate
+            return queryset.count()
+        return queryset[:FILTERED_COUNT_CAP].count()
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_per_page = 50
+    ordering = ("-pk",)  # walks the primary key index; also keeps autocomplete pagination stable
+
+
+# ---------------- MODEL ADMINS ----------------
+
+@admin.register(Project)
+class ProjectAdmin(LargeTableAdmin):
+    list_display = ("title", "user", "category", "visibility", "views", "created_at")
+    list_select_related = ("user",)
+    list_filter = ("visibility",)
+    search_fields = ("title",)
+    autocomplete_fields = ("user",)
+    readonly_fields = ("views", "trending_score", "created_at")
+
+
+@admin.register(ProjectImage)
+class ProjectImageAdmin(LargeTableAdmin):
+    list_display = ("id", "project_title", "image")
+    list_select_related = ("project",)
+    autocomplete_fields = ("project",)
+
+    @admin.display(description="project", ordering="project__title")
+    def project_title(self, obj):
+        return obj.project.title
+
+
+@admin.register(Profile)
+class ProfileAdmin(LargeTableAdmin):
+    list_display = ("user", "first_name", "last_name", "course", "location", "appreciation_count")
+    list_select_related = ("user",)
+    search_fields = ("user__username", "first_name", "last_name")
+    autocomplete_fields = ("user",)
+    readonly_fields = ("trending_score",)
+
+
+@admin.register(Message)
+class MessageAdmin(LargeTableAdmin):
+    list_display = ("created_at", "sender", "recipient", "project_title", "read")
+    list_select_related = ("sender", "recipient", "project")
+    list_filter = ("read",)
+    autocomplete_fields = ("project", "sender", "recipient")
+    raw_id_fields = ("thread",)
+
+    @admin.display(description="project", ordering="project__title")
+    def project_title(self, obj):
+        return obj.project.title
+
+
+@admin.register(Thread)
+class ThreadAdmin(LargeTableAdmin):
+    list_display = ("last_message_at", "user_low", "user_high", "project_title", "message_count", "unread_low", "unread_high")
+    list_select_related = ("user_low", "user_high", "project")
+    autocomplete_fields = ("project", "user_low", "user_high")
+    readonly_fields = ("last_message_at", "last_snippet", "last_sender", "message_count", "unread_low", "unread_high")
+
+    @admin.display(description="project", ordering="project__title")
+    def project_title(self, obj):
+        return obj.project.title
+
+
+@admin.register(Like)
+class LikeAdmin(LargeTableAdmin):
+    list_display = ("created_at", "user", "project_title")
+    list_select_related = ("user", "project")
+    autocomplete_fields = ("project", "user")
+
+    @admin.display(description="project", ordering="project__title")
+    def project_title(self, obj):
+        return obj.project.title
+
+
+@admin.register(HiringInquiry)
+class HiringInquiryAdmin(LargeTableAdmin):
+    list_display = ("created_at", "sender", "project_title", "hiring_type", "budget")
+    list_select_related = ("sender", "project")
+    list_filter = ("hiring_type",)
+    autocomplete_fields = ("project", "sender")
+
+    @admin.display(description="project", ordering="project__title")
+    def project_title(self, obj):
+        return obj.project.title
+
+
+@admin.register(EngagementEvent)
+class EngagementEventAdmin(LargeTableAdmin):
+    list_display = ("created_at", "event", "project_id", "user_id")
+    raw_id_fields = ("project", "user")
+
+
+@admin.register(ProjectDailyStats)
+class ProjectDailyStatsAdmin(LargeTableAdmin):
+    list_display = ("day", "project_id", "user_id", "views", "likes", "unlikes", "inquiries")
+    raw_id_fields = ("project", "user")
+
+
+@admin.register(RequestProfile)
+class RequestProfileAdmin(admin.ModelAdmin):
+    list_display = ("created_at", "method", "path", "status_code", "duration_ms", "user")
+    list_filter = ("method", "status_code")
+    search_fields = ("path",)
+    list_select_related = ("user",)
+    readonly_fields = ("user", "method", "path", "status_code", "duration_ms", "stats_file", "created_at", "top_functions")
+
+    def has_add_permission(self, request):
+        return False
+
+    @admin.display(description="Top functions (cumulative time)")
+    def top_functions(self, obj):
+        path = settings.PROFILES_DIR / obj.stats_file
+        if not path.exists():
+            return "Stats file is missing."
+        out = io.StringIO()
+        pstats.Stats(str(path), stream=out).sort_stats("cumulative").print_stats(40)
+        return format_html("<pre style='font-size:11px'>{}</pre>", out.getvalue())
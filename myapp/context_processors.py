@@ -0,0 +1,7 @@
+from django.conf import settings
+
+
+def deployment(request):
+    """Template flags for features that only exist in some deployments."""
+    # The notification stream needs ASGI; under WSGI the page must not open it.
+    return {"async_views": settings.ASYNC_VIEWS}
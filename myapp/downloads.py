@@ -0,0 +1,196 @@
+"""
+ZIP downloads of a project's images (only for projects with allow_downloads).
+
+Archives are streamed as they are generated: each image is copied from storage
+into a STORED (uncompressed, images are already compressed) zip entry in 64 KB
+pieces, and every piece is yielded to the client straight away.
+
+Once an archive has been requested DOWNLOAD_CACHE_MIN_HITS times, the next
+stream is also teed into DOWNLOAD_CACHE_DIR and published atomically when it
+completes. Cached archives are keyed by a hash of the project's image set, so
+adding or removing an image invalidates them, and are served with ETag and
+HTTP Range support so interrupted downloads can resume. Under ASGI the bodies
+are handed over as async iterators (see streaming.py).
+"""
+
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import zipfile
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, StreamingHttpResponse
+
+from .streaming import streaming_body
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class _StreamBuffer:
+    """Write-only, non-seekable sink for ZipFile; the generator drains it after every write."""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def archive_key(images):
+    digest = hashlib.sha1()
+    for image in sorted(images, key=lambda img: img.id):
+        digest.update(f"{image.id}:{image.image.name}\n".encode())
+    return digest.hexdigest()[:16]
+
+
+def archive_filename(project):
+    slug = re.sub(r"[^A-Za-z0-9]+", "-", project.title).strip("-").lower() or "project"
+    return f"{slug}-{project.id}.zip"
+
+
+def _cache_path(project, key):
+    return settings.DOWNLOAD_CACHE_DIR / f"project-{project.id}-{key}.zip"
+
+
+def _entry_names(images):
+    names = []
+    for index, image in enumerate(images, start=1):
+        names.append(f"{index:02d}-{os.path.basename(image.image.name)}")
+    return names
+
+
+def generate_zip(images):
+    """Yield the bytes of a zip archive of ``images`` without holding more than one chunk."""
+    sink = _StreamBuffer()
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED, allowZip64=True) as archive:
+        for image, name in zip(images, _entry_names(images)):
+            try:
+                source = image.image.open("rb")
+            except (FileNotFoundError, OSError):
+                logger.warning("Skipping missing image %s", image.image.name)
+                continue
+            with source, archive.open(name, mode="w", force_zip64=True) as entry:
+                while True:
+                    chunk = source.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    entry.write(chunk)
+                    yield sink.drain()
+            yield sink.drain()
+    yield sink.drain()
+
+
+def _tee_to_cache(chunks, path):
+    """Pass chunks through while writing them to ``path``; publish only if the stream completes."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".part")
+    completed = False
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            for chunk in chunks:
+                tmp.write(chunk)
+                yield chunk
+        os.replace(tmp_name, path)
+        completed = True
+        # Archives for older image sets of this project are now dead weight.
+        for stale in path.parent.glob(path.name.rsplit("-", 1)[0] + "-*.zip"):
+            if stale != path:
+                stale.unlink(missing_ok=True)
+    finally:
+        if not completed:
+            try:
+                os.unlink(tmp_name)
+            except FileNotFoundError:
+                pass
+
+
+def _file_range(path, start, length):
+    with open(path, "rb") as archive:
+        archive.seek(start)
+        while length > 0:
+            chunk = archive.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def _serve_cached(request, path, etag, filename):
+    size = path.stat().st_size
+    if request.headers.get("If-None-Match") == etag:
+        return HttpResponse(status=304, headers={"ETag": etag})
+
+    start, end = 0, size - 1
+    status = 200
+    range_header = request.headers.get("Range")
+    if_range = request.headers.get("If-Range")
+    if range_header and (not if_range or if_range == etag):
+        match = RANGE_RE.match(range_header.strip())
+        if match and any(match.groups()):
+            first, last = match.groups()
+            if first:
+                start = int(first)
+                end = min(int(last), size - 1) if last else size - 1
+            else:  # suffix range: the last N bytes
+                start = max(0, size - int(last))
+            if start > end or start >= size:
+                return HttpResponse(status=416, headers={"Content-Range": f"bytes */{size}"})
+            status = 206
+
+    response = StreamingHttpResponse(
+        streaming_body(request, _file_range(path, start, end - start + 1)),
+        status=status,
+        content_type="application/zip",
+    )
+    response["Content-Length"] = str(end - start + 1)
+    if status == 206:
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    response["Accept-Ranges"] = "bytes"
+    response["ETag"] = etag
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+def project_zip_response(request, project):
+    images = list(project.images.order_by("id"))
+    key = archive_key(images)
+    etag = f'"{key}"'
+    filename = archive_filename(project)
+    path = _cache_path(project, key)
+
+    if path.exists():
+        return _serve_cached(request, path, etag, filename)
+
+    hits_key = f"project-zip-hits:{project.id}:{key}"
+    cache.add(hits_key, 0, timeout=24 * 3600)
+    hits = cache.incr(hits_key)
+
+    chunks = generate_zip(images)
+    if hits >= settings.DOWNLOAD_CACHE_MIN_HITS:
+        chunks = _tee_to_cache(chunks, path)
+
+    response = StreamingHttpResponse(streaming_body(request, chunks), content_type="application/zip")
+    # Length is unknown while streaming, so resume only works once the archive is cached.
+    response["Accept-Ranges"] = "none"
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
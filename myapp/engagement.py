@@ -0,0 +1,97 @@
+"""
+Batched engagement logging.
+
+Views, likes, unlikes and hiring inquiries are buffered in memory per worker and
+written to EngagementEvent with one bulk_create once the buffer holds
+ENGAGEMENT_BUFFER_SIZE events or its oldest event is ENGAGEMENT_FLUSH_SECONDS
+old; a timer thread takes care of the second case, so a quiet worker does not
+sit on its last few events. The request path therefore costs one INSERT per
+batch, not per event.
+Events still buffered when a worker is killed are lost, which is acceptable for
+analytics. `manage.py rollup_engagement` turns the raw log into ProjectDailyStats.
+"""
+
+import atexit
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, IntegrityError, connections, transaction
+from django.utils import timezone
+
+from .models import EngagementEvent, Project
+
+logger = logging.getLogger(__name__)
+
+
+class EventBuffer:
+    def __init__(self, max_size, max_age):
+        self.max_size = max_size
+        self.max_age = max_age
+        self._events = []
+        self._oldest = None
+        self._timer = None
+        self._lock = threading.Lock()
+
+    def add(self, event):
+        with self._lock:
+            if not self._events:
+                self._oldest = time.monotonic()
+                self._timer = threading.Timer(self.max_age, self._flush_on_timer)
+                self._timer.daemon = True
+                self._timer.start()
+            self._events.append(event)
+            if len(self._events) < self.max_size and time.monotonic() - self._oldest < self.max_age:
+                return
+            batch = self._take()
+        self._write(batch)
+
+    def flush(self):
+        with self._lock:
+            batch = self._take()
+        self._write(batch)
+
+    def _flush_on_timer(self):
+        try:
+            self.flush()
+        finally:
+            connections.close_all()  # the timer thread's own connection; the thread ends here
+
+    def _take(self):
+        if self._timer is not None:
+            self._timer.cancel()
+        batch, self._events, self._oldest, self._timer = self._events, [], None, None
+        return batch
+
+    def _write(self, batch):
+        if not batch:
+            return
+        try:
+            EngagementEvent.objects.bulk_create(batch)
+        except IntegrityError:
+            # A project was deleted while its events sat in the buffer.
+            existing = set(
+                Project.objects.filter(id__in={e.project_id for e in batch}).values_list("id", flat=True)
+            )
+            EngagementEvent.objects.bulk_create([e for e in batch if e.project_id in existing])
+        except DatabaseError:
+            logger.exception("Dropped %d engagement events", len(batch))
+
+
+_buffer = EventBuffer(
+    max_size=getattr(settings, "ENGAGEMENT_BUFFER_SIZE", 200),
+    max_age=getattr(settings, "ENGAGEMENT_FLUSH_SECONDS", 5),
+)
+atexit.register(_buffer.flush)
+
+
+def log_event(project_id, user_id, event):
+    # Buffer only once the surrounding transaction commits, so rolled-back
+    # likes are never logged and flushes never run inside someone else's atomic block.
+    record = EngagementEvent(project_id=project_id, user_id=user_id, event=event, created_at=timezone.now())
+    transaction.on_commit(lambda: _buffer.add(record))
+
+
+def flush():
+    _buffer.flush()
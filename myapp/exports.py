@@ -0,0 +1,154 @@
+"""
+Streaming CSV/JSON exports of projects, hiring inquiries and messages.
+
+Rows come from ``.iterator(chunk_size=...)`` over a select_related queryset and
+are encoded one at a time, so memory stays flat no matter how big the tables
+are. Used by the admin export view and ``manage.py export_data``.
+"""
+
+import csv
+import json
+from datetime import timedelta
+
+from django.db.models import Count, Value
+from django.db.models.functions import Concat
+from django.utils import timezone
+
+from .models import HiringInquiry, Message, Project
+
+CHUNK_SIZE = 2000
+
+
+class Echo:
+    """File-like object whose write() just hands the line back to csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def _apply_filters(queryset, filters, project_path=""):
+    """Apply the my_projects filters: student name, project title and last N days."""
+    name = (filters.get("name") or "").strip()
+    title = (filters.get("project") or "").strip()
+    recent_days = str(filters.get("recent_days") or "").strip()
+
+    if name:
+        queryset = queryset.annotate(
+            export_student_name=Concat(
+                f"{project_path}user__profile__first_name", Value(" "), f"{project_path}user__profile__last_name"
+            )
+        ).filter(export_student_name__icontains=name)
+    if title:
+        queryset = queryset.filter(**{f"{project_path}title__icontains": title})
+    if recent_days.isdigit():
+        queryset = queryset.filter(created_at__gte=timezone.now() - timedelta(days=int(recent_days)))
+    return queryset
+
+
+def _student_name(user):
+    profile = getattr(user, "profile", None)
+    full_name = f"{profile.first_name} {profile.last_name}".strip() if profile else ""
+    return full_name or user.username
+
+
+def project_rows(filters):
+    queryset = _apply_filters(
+        Project.objects
+        .select_related("user__profile")
+        .annotate(like_count=Count("likes", distinct=True))
+        .order_by("id"),
+        filters,
+    )
+    for project in queryset.iterator(chunk_size=CHUNK_SIZE):
+        yield {
+            "id": project.id,
+            "title": project.title,
+            "student": _student_name(project.user),
+            "username": project.user.username,
+            "category": project.category,
+            "visibility": project.visibility,
+            "created_at": project.created_at.isoformat(),
+            "views": project.views,
+            "likes": project.like_count,
+        }
+
+
+def inquiry_rows(filters):
+    queryset = _apply_filters(
+        HiringInquiry.objects.select_related("project__user__profile", "sender").order_by("id"),
+        filters,
+        project_path="project__",
+    )
+    for inquiry in queryset.iterator(chunk_size=CHUNK_SIZE):
+        yield {
+            "id": inquiry.id,
+            "project_id": inquiry.project_id,
+            "project": inquiry.project.title,
+            "student": _student_name(inquiry.project.user),
+            "sender": inquiry.sender.username,
+            "hiring_for": inquiry.hiring_for,
+            "hiring_type": inquiry.hiring_type,
+            "categories": inquiry.categories,
+            "budget": inquiry.budget,
+            "description": inquiry.description,
+            "created_at": inquiry.created_at.isoformat(),
+        }
+
+
+def message_rows(filters):
+    queryset = _apply_filters(
+        Message.objects.select_related("project__user__profile", "sender", "recipient").order_by("id"),
+        filters,
+        project_path="project__",
+    )
+    for message in queryset.iterator(chunk_size=CHUNK_SIZE):
+        yield {
+            "id": message.id,
+            "project_id": message.project_id,
+            "project": message.project.title,
+            "student": _student_name(message.project.user),
+            "sender": message.sender.username,
+            "recipient": message.recipient.username,
+            "content": message.content,
+            "read": message.read,
+            "created_at": message.created_at.isoformat(),
+        }
+
+
+EXPORTS = {
+    "projects": (
+        ["id", "title", "student", "username", "category", "visibility", "created_at", "views", "likes"],
+        project_rows,
+    ),
+    "inquiries": (
+        ["id", "project_id", "project", "student", "sender", "hiring_for", "hiring_type", "categories",
+         "budget", "description", "created_at"],
+        inquiry_rows,
+    ),
+    "messages": (
+        ["id", "project_id", "project", "student", "sender", "recipient", "content", "read", "created_at"],
+        message_rows,
+    ),
+}
+
+
+def stream_csv(columns, rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow([row[column] for column in columns])
+
+
+def stream_json(rows):
+    yield "["
+    separator = "\n"
+    for row in rows:
+        yield separator + json.dumps(row)
+        separator = ",\n"
+    yield "\n]\n"
+
+
+def stream_export(kind, fmt, filters):
+    columns, make_rows = EXPORTS[kind]
+    rows = make_rows(filters)
+    return stream_json(rows) if fmt == "json" else stream_csv(columns, rows)
@@ -0,0 +1,62 @@
+"""
+Backfill for message threads.
+
+``group_messages_into_threads`` builds one Thread per (project, participant
+pair) from the existing message table and links every message to it; it
+expects the thread table to be empty. It takes the model classes as arguments
+so the data migration can pass its historical models; bulk-seeded data (the
+bench command) uses the live ones.
+"""
+
+from django.db.models import Count, Max, OuterRef, Q, Subquery
+from django.db.models.functions import Greatest, Least
+from django.utils.text import Truncator
+
+BATCH_SIZE = 500
+
+
+def group_messages_into_threads(Thread, Message):
+    snippet_length = Thread._meta.get_field("last_snippet").max_length
+    # One GROUP BY per direction of each conversation; merge both directions in Python.
+    threads = {}
+    rows = (
+        Message.objects.order_by()
+        .values("project_id", "sender_id", "recipient_id")
+        .annotate(count=Count("id"), last_id=Max("id"), unread=Count("id", filter=Q(read=False)))
+    )
+    for row in rows.iterator():
+        low, high = sorted((row["sender_id"], row["recipient_id"]))
+        thread = threads.setdefault(
+            (row["project_id"], low, high),
+            Thread(project_id=row["project_id"], user_low_id=low, user_high_id=high),
+        )
+        thread.message_count += row["count"]
+        if row["recipient_id"] == low:
+            thread.unread_low += row["unread"]
+        else:
+            thread.unread_high += row["unread"]
+        thread.last_id = max(getattr(thread, "last_id", 0), row["last_id"])
+
+    # Ids grow with created_at, so the highest id in a thread is its last message.
+    threads = list(threads.values())
+    for start in range(0, len(threads), BATCH_SIZE):
+        batch = threads[start:start + BATCH_SIZE]
+        last_messages = Message.objects.only("created_at", "content", "sender_id").in_bulk(
+            [thread.last_id for thread in batch]
+        )
+        for thread in batch:
+            last = last_messages[thread.last_id]
+            thread.last_message_at = last.created_at
+            thread.last_snippet = Truncator(last.content).chars(snippet_length)
+            thread.last_sender_id = last.sender_id
+    Thread.objects.bulk_create(threads, batch_size=BATCH_SIZE)
+
+    # Link every message in one UPDATE; the lookup hits the unique (project, user_low, user_high) index.
+    Message.objects.filter(thread__isnull=True).update(thread_id=Subquery(
+        Thread.objects.filter(
+            project_id=OuterRef("project_id"),
+            user_low_id=Least(OuterRef("sender_id"), OuterRef("recipient_id")),
+            user_high_id=Greatest(OuterRef("sender_id"), OuterRef("recipient_id")),
+        ).values("id")[:1]
+    ))
+    return len(threads)
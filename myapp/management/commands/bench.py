@@ -0,0 +1,291 @@
+import json
+import statistics
+import time
+import tracemalloc
+from itertools import islice
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient, Client
+from django.test.utils import (
+    CaptureQueriesContext,
+    override_settings,
+    setup_test_environment,
+    teardown_test_environment,
+)
+from django.urls import reverse
+
+from myapp.inbox import group_messages_into_threads
+from myapp.profile_stats import stats_expressions
+from myapp.models import Like, Message, Profile, Project, ProjectImage, Thread
+
+BATCH_SIZE = 5000
+
+
+def bulk_create_in_batches(model, objs):
+    """bulk_create from a generator without materializing it (bulk_create itself calls list() on it)."""
+    objs = iter(objs)
+    while batch := list(islice(objs, BATCH_SIZE)):
+        model.objects.bulk_create(batch)
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a synthetic dataset into a throwaway test database and benchmark the main views. "
+        "Example at production scale: "
+        "manage.py bench --students 5000 --projects 100000 --images 300000 --likes 1000000 --messages 1000000"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--students", type=int, default=500)
+        parser.add_argument("--projects", type=int, default=5000)
+        parser.add_argument("--images", type=int, default=15000)
+        parser.add_argument("--likes", type=int, default=50000)
+        parser.add_argument("--messages", type=int, default=50000)
+        parser.add_argument("--iterations", type=int, default=20, help="Timed requests per view.")
+        parser.add_argument("--output", default="bench_results.json", help="Where to write the JSON results.")
+        parser.add_argument(
+            "--baseline",
+            default=str(settings.BASE_DIR / "bench_baseline.json"),
+            help="Stored results to compare against.",
+        )
+        parser.add_argument(
+            "--update-baseline", action="store_true", help="Overwrite the baseline with this run's results."
+        )
+        parser.add_argument(
+            "--asgi",
+            action="store_true",
+            help="Drive requests through the ASGI handler. Combine with DJANGO_ASYNC_VIEWS=1 to bench the async views.",
+        )
+        parser.add_argument(
+            "--tolerance", type=float, default=0.25, help="Allowed relative p95 slowdown before flagging (0.25 = 25%%)."
+        )
+
+    def handle(self, *args, **options):
+        if options["students"] < 1 or options["projects"] < 1:
+            raise CommandError("Need at least one student and one project.")
+        if options["likes"] > options["students"] * options["projects"]:
+            raise CommandError("--likes cannot exceed students * projects (one like per user per project).")
+
+        # Never touch the real database: build a separate test database like the test runner does.
+        # Plain static storage, so the bench does not depend on a collectstatic manifest,
+        # and no snapshot reads, which would bypass the test database.
+        setup_test_environment()
+        plain_static = override_settings(STORAGES={
+            **settings.STORAGES,
+            "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+        }, SNAPSHOT_REFRESH_SECONDS=0)
+        plain_static.enable()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            started = time.perf_counter()
+            fixtures = self.seed(options)
+            self.stdout.write(f"Seeded dataset in {time.perf_counter() - started:.1f}s")
+            results = {
+                "dataset": {key: options[key] for key in ("students", "projects", "images", "likes", "messages")},
+                "iterations": options["iterations"],
+                "handler": "asgi" if options["asgi"] else "wsgi",
+                "async_views": settings.ASYNC_VIEWS,
+                "views": self.run_views(fixtures, options["iterations"], options["asgi"]),
+            }
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            plain_static.disable()
+            teardown_test_environment()
+
+        self.report(results)
+        Path(options["output"]).write_text(json.dumps(results, indent=2))
+        self.stdout.write(f"Results written to {options['output']}")
+
+        baseline_path = Path(options["baseline"])
+        if options["update_baseline"]:
+            baseline_path.write_text(json.dumps(results, indent=2))
+            self.stdout.write(self.style.SUCCESS(f"Baseline updated at {baseline_path}"))
+        elif baseline_path.exists():
+            regressions = self.compare(results, json.loads(baseline_path.read_text()), options["tolerance"])
+            if regressions:
+                raise CommandError(f"{len(regressions)} regression(s) against {baseline_path}")
+            self.stdout.write(self.style.SUCCESS("No regressions against baseline."))
+        else:
+            self.stdout.write(f"No baseline at {baseline_path}; run with --update-baseline to store one.")
+
+    # ---------------- SEEDING ----------------
+
+    def seed(self, options):
+        # Hash once and reuse; PBKDF2 per user would dominate seeding time.
+        password = make_password("bench-password")
+
+        admin = User.objects.create(username="bench_admin", password=password, is_superuser=True, is_staff=True)
+        bulk_create_in_batches(User,
+            (User(username=f"bench_student_{i}", password=password) for i in range(options["students"])),
+        )
+        student_ids = list(User.objects.filter(is_superuser=False).order_by("id").values_list("id", flat=True))
+
+        bulk_create_in_batches(Profile,
+            [Profile(user=admin, first_name="Bench", last_name="Admin")]
+            + [
+                Profile(user_id=user_id, first_name=f"First{i}", last_name=f"Last{i}", location="Chennai")
+                for i, user_id in enumerate(student_ids)
+            ],
+        )
+
+        bulk_create_in_batches(Project,
+            (
+                Project(
+                    user_id=student_ids[i % len(student_ids)],
+                    title=f"Project {i}",
+                    category="Branding",
+                    description="Synthetic benchmark project " * 4,
+                    tags="bench,synthetic",
+                    visibility="Public" if i % 5 else "Private",
+                    views=i % 1000,
+                )
+                for i in range(options["projects"])
+            ),
+        )
+        project_ids = list(Project.objects.order_by("id").values_list("id", flat=True))
+
+        bulk_create_in_batches(ProjectImage,
+            (
+                ProjectImage(project_id=project_ids[i % len(project_ids)], image=f"projects/bench_{i}.jpg")
+                for i in range(options["images"])
+            ),
+        )
+
+        # Walk projects fastest so every (project, user) pair is unique.
+        bulk_create_in_batches(Like,
+            (
+                Like(
+                    project_id=project_ids[i % len(project_ids)],
+                    user_id=student_ids[(i // len(project_ids)) % len(student_ids)],
+                )
+                for i in range(options["likes"])
+            ),
+        )
+
+        # Half of the messages go to the admin (upload notices), half to students (hiring inquiries).
+        bulk_create_in_batches(Message,
+            (
+                Message(
+                    project_id=project_ids[i % len(project_ids)],
+                    sender_id=student_ids[i % len(student_ids)],
+                    recipient_id=admin.id if i % 2 else student_ids[(i + 1) % len(student_ids)],
+                    content=f"Synthetic message {i}",
+                    read=bool(i % 3),
+                )
+                for i in range(options["messages"])
+            ),
+        )
+        # bulk_create skips Message.save and the model signals, so fill in the denormalized
+        # threads and profile totals the way the migrations do.
+        group_messages_into_threads(Thread, Message)
+        Profile.objects.update(**stats_expressions(Project, Like))
+
+        student = User.objects.get(id=student_ids[0])
+        return {
+            "admin": admin,
+            "student": student,
+            "project_id": Project.objects.filter(user=student).values_list("id", flat=True).first() or project_ids[0],
+            "profile_id": Profile.objects.get(user=student).id,
+        }
+
+    # ---------------- MEASUREMENT ----------------
+
+    def scenarios(self, fixtures):
+        admin, student = fixtures["admin"], fixtures["student"]
+        project_id, profile_id = fixtures["project_id"], fixtures["profile_id"]
+        return [
+            ("Dashboard (admin)", admin, reverse("dashboard")),
+            ("Dashboard (student)", student, reverse("dashboard")),
+            ("my_projects (admin)", admin, reverse("my_projects")),
+            ("my_projects (student)", student, reverse("my_projects")),
+            ("project_detail", student, reverse("project_detail", args=[project_id])),
+            ("view_student_projects", admin, reverse("view_student_projects", args=[profile_id])),
+            ("AllMessagesView (admin)", admin, reverse("all_messages")),
+            ("AllMessagesView (student)", student, reverse("all_messages")),
+            ("inbox (student)", student, reverse("inbox")),
+            ("HireNowView", admin, reverse("hire_now", args=[project_id])),
+        ]
+
+    def run_views(self, fixtures, iterations, asgi=False):
+        clients = {}
+        results = {}
+        for name, user, url in self.scenarios(fixtures):
+            if user.pk not in clients:
+                client = AsyncClient() if asgi else Client()
+                client.force_login(user)
+                clients[user.pk] = async_to_sync(client.get) if asgi else client.get
+            get = clients[user.pk]
+
+            # One traced warm-up request for query count and peak memory; tracemalloc
+            # slows everything down, so it stays out of the timed loop.
+            tracemalloc.start()
+            with CaptureQueriesContext(connection) as queries:
+                response = get(url)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            # Read the count now: every later request resets connection.queries.
+            query_count = len(queries)
+            if response.status_code != 200:
+                raise CommandError(f"{name} returned HTTP {response.status_code}")
+
+            timings = []
+            for _ in range(iterations):
+                started = time.perf_counter()
+                get(url)
+                timings.append((time.perf_counter() - started) * 1000)
+
+            results[name] = {
+                "url": url,
+                "p50_ms": round(statistics.median(timings), 2),
+                "p95_ms": round(self.percentile(timings, 95), 2),
+                "queries": query_count,
+                "peak_memory_kb": round(peak / 1024, 1),
+            }
+            self.stdout.write(f"  measured {name}")
+        return results
+
+    @staticmethod
+    def percentile(values, pct):
+        ordered = sorted(values)
+        index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+        return ordered[index]
+
+    # ---------------- REPORTING ----------------
+
+    def report(self, results):
+        self.stdout.write(f"\n{'view':<28}{'p50 ms':>10}{'p95 ms':>10}{'queries':>10}{'peak KB':>12}")
+        for name, row in results["views"].items():
+            self.stdout.write(
+                f"{name:<28}{row['p50_ms']:>10}{row['p95_ms']:>10}{row['queries']:>10}{row['peak_memory_kb']:>12}"
+            )
+        self.stdout.write("")
+
+    def compare(self, results, baseline, tolerance):
+        if baseline.get("dataset") != results["dataset"]:
+            self.stdout.write(self.style.WARNING("Baseline was recorded with a different dataset size."))
+        if baseline.get("handler", "wsgi") != results["handler"]:
+            self.stdout.write(self.style.WARNING(
+                f"Comparing {results['handler']} results against a {baseline.get('handler', 'wsgi')} baseline."
+            ))
+
+        regressions = []
+        for name, row in results["views"].items():
+            base = baseline.get("views", {}).get(name)
+            if not base:
+                continue
+            if row["queries"] > base["queries"]:
+                regressions.append(f"{name}: queries {base['queries']} -> {row['queries']}")
+            if row["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+                regressions.append(f"{name}: p95 {base['p95_ms']}ms -> {row['p95_ms']}ms")
+            if row["peak_memory_kb"] > base["peak_memory_kb"] * (1 + tolerance):
+                regressions.append(f"{name}: peak memory {base['peak_memory_kb']}KB -> {row['peak_memory_kb']}KB")
+
+        for line in regressions:
+            self.stdout.write(self.style.ERROR(f"REGRESSION {line}"))
+        return regressions
@@ -0,0 +1,26 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from myapp.exports import EXPORTS, stream_export
+
+
+class Command(BaseCommand):
+    help = "Stream projects, hiring inquiries or messages to CSV/JSON with constant memory."
+
+    def add_arguments(self, parser):
+        parser.add_argument("kind", choices=sorted(EXPORTS))
+        parser.add_argument("--format", choices=["csv", "json"], default="csv")
+        parser.add_argument("--output", "-o", help="File to write (default: stdout).")
+        parser.add_argument("--name", help="Student name contains (same as the my_projects filter).")
+        parser.add_argument("--project", help="Project title contains.")
+        parser.add_argument("--recent-days", help="Only rows created in the last N days.")
+
+    def handle(self, *args, **options):
+        filters = {"name": options["name"], "project": options["project"], "recent_days": options["recent_days"]}
+        chunks = stream_export(options["kind"], options["format"], filters)
+        if options["output"]:
+            with open(options["output"], "w", newline="", encoding="utf-8") as out:
+                out.writelines(chunks)
+        else:
+            sys.stdout.writelines(chunks)
@@ -0,0 +1,131 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from myapp.models import Profile, ProjectImage
+
+BATCH_SIZE = 5000
+FILES_PER_UNIT = 500  # files of a flat directory handed to one worker at a time
+
+
+class RateLimiter:
+    """Allow at most ``rate`` operations per second across all threads (0 = unlimited)."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0
+        self.next_slot = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            delay = self.next_slot - now
+            self.next_slot = max(now, self.next_slot) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+class Command(BaseCommand):
+    help = (
+        "Find files under MEDIA_ROOT that no ProjectImage or Profile row references and delete "
+        "the ones older than the grace period. The download cache directory is left alone."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Report orphans without deleting them.")
+        parser.add_argument(
+            "--grace-hours", type=float, default=24,
+            help="Ignore files modified more recently than this (uploads still in flight).",
+        )
+        parser.add_argument("--workers", type=int, default=8, help="Directories and file batches scanned in parallel.")
+        parser.add_argument("--rate", type=float, default=200, help="Max files examined per second (0 = no limit).")
+
+    def handle(self, *args, **options):
+        media_root = Path(settings.MEDIA_ROOT)
+        referenced = self.referenced_paths()
+        self.stdout.write(f"{len(referenced)} files referenced by the database")
+
+        skip_dirs = {Path(settings.DOWNLOAD_CACHE_DIR).resolve()}
+        cutoff = time.time() - options["grace_hours"] * 3600
+        limiter = RateLimiter(options["rate"])
+        stats = {"scanned": 0, "orphans": 0, "bytes": 0}
+        stats_lock = threading.Lock()
+
+        def visit(path):
+            limiter.wait()
+            relative = path.relative_to(media_root).as_posix()
+            if relative in referenced:
+                orphan = False
+            else:
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    return
+                orphan = stat.st_mtime < cutoff
+            with stats_lock:
+                stats["scanned"] += 1
+                if orphan:
+                    stats["orphans"] += 1
+                    stats["bytes"] += stat.st_size
+            if orphan:
+                if options["dry_run"]:
+                    self.stdout.write(f"orphan {relative}")
+                else:
+                    path.unlink(missing_ok=True)
+
+        def walk(directory):
+            for root, dirs, files in os.walk(directory):
+                dirs[:] = [d for d in dirs if (Path(root) / d).resolve() not in skip_dirs]
+                for name in files:
+                    visit(Path(root) / name)
+
+        def visit_all(paths):
+            for path in paths:
+                visit(path)
+
+        # Each subdirectory below the top level is one unit of parallel work. Uploads mostly sit
+        # directly in a top-level directory (projects/, profiles/), so those files are handed out
+        # in batches of FILES_PER_UNIT rather than visited one by one here.
+        with ThreadPoolExecutor(max_workers=options["workers"]) as pool:
+            futures = []
+            batch = []
+            for top in media_root.iterdir() if media_root.exists() else []:
+                if top.resolve() in skip_dirs:
+                    continue
+                for entry in [top] if top.is_file() else top.iterdir():
+                    if entry.is_dir():
+                        if entry.resolve() not in skip_dirs:
+                            futures.append(pool.submit(walk, entry))
+                        continue
+                    batch.append(entry)
+                    if len(batch) == FILES_PER_UNIT:
+                        futures.append(pool.submit(visit_all, batch))
+                        batch = []
+            if batch:
+                futures.append(pool.submit(visit_all, batch))
+            for future in futures:
+                future.result()  # re-raise anything a worker hit
+
+        verb = "would delete" if options["dry_run"] else "deleted"
+        self.stdout.write(self.style.SUCCESS(
+            f"Scanned {stats['scanned']} files; {verb} {stats['orphans']} orphans "
+            f"({stats['bytes'] / 1024 / 1024:.1f} MB)."
+        ))
+
+    @staticmethod
+    def referenced_paths():
+        referenced = set()
+        for name in ProjectImage.objects.values_list("image", flat=True).iterator(chunk_size=BATCH_SIZE):
+            referenced.add(name)
+        for name in Profile.objects.values_list("profile_image", flat=True).iterator(chunk_size=BATCH_SIZE):
+            referenced.add(name)
+        referenced.add(Profile._meta.get_field("profile_image").default)
+        referenced.discard("")
+        return referenced
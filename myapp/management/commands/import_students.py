@@ -0,0 +1,37 @@
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from myapp.onboarding import DEFAULT_CHUNK_SIZE, import_students, read_rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Create student accounts in bulk from a CSV or JSON file. Columns: username, password and "
+        "optionally first_name, last_name, course, mobile, location, address."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--format", choices=["csv", "json"], help="Defaults to the file extension.")
+        parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument("--workers", type=int, help="Password hashing processes (default: CPU count).")
+
+    def handle(self, *args, **options):
+        path = Path(options["path"])
+        fmt = options["format"] or path.suffix.lstrip(".").lower()
+        try:
+            rows = read_rows(path.read_bytes(), fmt)
+        except (OSError, ValueError) as exc:
+            raise CommandError(f"Could not read {path}: {exc}")
+
+        started = time.perf_counter()
+        result = import_students(rows, chunk_size=options["chunk_size"], workers=options["workers"])
+
+        for number, username, message in result.errors:
+            self.stderr.write(f"row {number} ({username or '-'}): {message}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {len(result.created)} of {len(rows)} students in {time.perf_counter() - started:.1f}s "
+            f"({len(result.errors)} errors)."
+        ))
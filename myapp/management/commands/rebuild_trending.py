@@ -0,0 +1,55 @@
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from myapp.models import HiringInquiry, Like, Profile, Project
+from myapp.trending import event_score
+
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute every trending_score from views, likes and hiring inquiries. "
+        "Use it to backfill, repair drift, or after moving TRENDING_EPOCH."
+    )
+
+    def handle(self, *args, **options):
+        project_scores = defaultdict(float)
+        owners = {}
+
+        # Lifetime view counts have no timestamps; count them at the project's creation time.
+        for project_id, user_id, views, created_at in (
+            Project.objects.values_list("id", "user_id", "views", "created_at").iterator(chunk_size=BATCH_SIZE)
+        ):
+            owners[project_id] = user_id
+            project_scores[project_id] += event_score("view", created_at) * views
+
+        for project_id, created_at in Like.objects.values_list("project_id", "created_at").iterator(chunk_size=BATCH_SIZE):
+            project_scores[project_id] += event_score("like", created_at)
+
+        for project_id, created_at in (
+            HiringInquiry.objects.values_list("project_id", "created_at").iterator(chunk_size=BATCH_SIZE)
+        ):
+            project_scores[project_id] += event_score("hire", created_at)
+
+        user_scores = defaultdict(float)
+        for project_id, user_id in owners.items():
+            user_scores[user_id] += project_scores[project_id]
+
+        with transaction.atomic():
+            Project.objects.bulk_update(
+                [Project(id=project_id, trending_score=project_scores[project_id]) for project_id in owners],
+                ["trending_score"],
+                batch_size=BATCH_SIZE,
+            )
+            Profile.objects.update(trending_score=0)
+            profiles = list(Profile.objects.filter(user_id__in=user_scores.keys()).only("id", "user_id"))
+            for profile in profiles:
+                profile.trending_score = user_scores[profile.user_id]
+            Profile.objects.bulk_update(profiles, ["trending_score"], batch_size=BATCH_SIZE)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt trending scores for {len(owners)} projects and {len(profiles)} students."
+        ))
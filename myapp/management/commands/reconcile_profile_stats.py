@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+
+from myapp.models import Like, Profile, Project
+from myapp.profile_stats import STATS_FIELDS, stats_expressions
+
+BATCH_SIZE = 500
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare each profile's project_count, total_likes and total_views with the source tables "
+        "(one aggregate query) and repair the profiles that drifted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Report drift without fixing it.")
+
+    def handle(self, *args, **options):
+        expressions = stats_expressions(Project, Like)
+        rows = (
+            Profile.objects
+            .annotate(**{f"actual_{field}": expression for field, expression in expressions.items()})
+            .values_list("id", *STATS_FIELDS, *(f"actual_{field}" for field in STATS_FIELDS))
+        )
+        width = len(STATS_FIELDS)
+        drifted = []
+        for profile_id, *values in rows.iterator(chunk_size=BATCH_SIZE):
+            stored, actual = values[:width], values[width:]
+            if stored != actual:
+                drifted.append(profile_id)
+                if options["dry_run"]:
+                    changes = ", ".join(
+                        f"{field} {old} -> {new}"
+                        for field, old, new in zip(STATS_FIELDS, stored, actual)
+                        if old != new
+                    )
+                    self.stdout.write(f"profile {profile_id}: {changes}")
+
+        if not options["dry_run"]:
+            # Recompute at write time so increments that landed since the scan are not lost.
+            for start in range(0, len(drifted), BATCH_SIZE):
+                Profile.objects.filter(pk__in=drifted[start:start + BATCH_SIZE]).update(**expressions)
+
+        verb = "would repair" if options["dry_run"] else "repaired"
+        self.stdout.write(self.style.SUCCESS(f"{len(drifted)} profiles drifted; {verb} them."))
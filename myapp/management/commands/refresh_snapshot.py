@@ -0,0 +1,36 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from myapp.snapshot import refresh_snapshot
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy the primary database to SNAPSHOT_PATH with SQLite's online backup API and swap the "
+        "copy in atomically. With --loop, repeat every SNAPSHOT_REFRESH_SECONDS."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--loop", action="store_true", help="Keep refreshing until stopped.")
+
+    def handle(self, *args, **options):
+        interval = settings.SNAPSHOT_REFRESH_SECONDS
+        if options["loop"] and not interval:
+            self.stdout.write("SNAPSHOT_REFRESH_SECONDS is 0; snapshot reads are off.")
+            return
+        while True:
+            started = time.monotonic()
+            try:
+                refresh_snapshot()
+            except Exception as exc:
+                if not options["loop"]:
+                    raise
+                # Views fall back to the primary once the snapshot is too old; keep trying.
+                self.stderr.write(f"snapshot refresh failed: {exc}")
+            else:
+                self.stdout.write(f"snapshot refreshed in {(time.monotonic() - started) * 1000:.0f} ms")
+            if not options["loop"]:
+                return
+            time.sleep(max(0.0, interval - (time.monotonic() - started)))
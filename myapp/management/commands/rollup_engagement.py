@@ -0,0 +1,83 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Q
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from myapp.engagement import flush
+from myapp.models import EngagementEvent, ProjectDailyStats
+
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = (
+        "Roll the raw engagement log up into ProjectDailyStats and prune old raw events. "
+        "Recent days are recomputed from scratch, so running it repeatedly is safe."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=2, help="Recompute this many most recent days (default 2).")
+        parser.add_argument("--retention-days", type=int, default=30, help="Delete raw events older than this.")
+
+    def handle(self, *args, **options):
+        if options["retention_days"] <= options["days"]:
+            self.stderr.write("--retention-days must be larger than --days or events are pruned before rollup.")
+            return
+
+        # Only this process's buffer; web workers' timers write theirs within ENGAGEMENT_FLUSH_SECONDS,
+        # which the recomputed recent days pick up on the next run.
+        flush()
+        since = timezone.now().date() - timedelta(days=options["days"] - 1)
+
+        # GROUP BY project/day in the database and stream the aggregates.
+        rows = (
+            EngagementEvent.objects
+            .filter(created_at__date__gte=since)
+            .annotate(day=TruncDate("created_at"))
+            .values("project_id", "project__user_id", "day")
+            .annotate(
+                views=Count("id", filter=Q(event=EngagementEvent.VIEW)),
+                likes=Count("id", filter=Q(event=EngagementEvent.LIKE)),
+                unlikes=Count("id", filter=Q(event=EngagementEvent.UNLIKE)),
+                inquiries=Count("id", filter=Q(event=EngagementEvent.HIRE)),
+            )
+            .order_by()
+            .iterator(chunk_size=BATCH_SIZE)
+        )
+
+        written = 0
+        batch = []
+        for row in rows:
+            batch.append(ProjectDailyStats(
+                project_id=row["project_id"],
+                user_id=row["project__user_id"],
+                day=row["day"],
+                views=row["views"],
+                likes=row["likes"],
+                unlikes=row["unlikes"],
+                inquiries=row["inquiries"],
+            ))
+            if len(batch) >= BATCH_SIZE:
+                written += self.upsert(batch)
+                batch = []
+        written += self.upsert(batch)
+
+        cutoff = timezone.now() - timedelta(days=options["retention_days"])
+        pruned, _ = EngagementEvent.objects.filter(created_at__lt=cutoff).delete()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rolled up {written} project-days since {since}; pruned {pruned} raw events."
+        ))
+
+    @staticmethod
+    def upsert(batch):
+        if batch:
+            ProjectDailyStats.objects.bulk_create(
+                batch,
+                update_conflicts=True,
+                unique_fields=["project", "day"],
+                update_fields=["views", "likes", "unlikes", "inquiries"],
+            )
+        return len(batch)
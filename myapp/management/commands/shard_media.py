@@ -0,0 +1,86 @@
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from myapp.models import Profile, ProjectImage, sharded_path
+
+SHARDED_RE = re.compile(r"^(projects|profiles)/[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{32}(\.\w+)?$")
+
+TARGETS = [
+    # (model, field name, upload prefix)
+    (ProjectImage, "image", "projects"),
+    (Profile, "profile_image", "profiles"),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Move existing uploads from the flat projects/ and profiles/ directories into the sharded "
+        "layout. Safe to run while the site is up: each file is copied first, its row is switched "
+        "with a conditional UPDATE, and only then is the old file removed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--workers", type=int, default=8, help="Parallel file copies.")
+        parser.add_argument("--dry-run", action="store_true", help="Only count the files that would move.")
+        parser.add_argument(
+            "--keep-old", action="store_true",
+            help="Leave the original files in place (e.g. while cached pages still link to them).",
+        )
+
+    def handle(self, *args, **options):
+        with ThreadPoolExecutor(max_workers=options["workers"]) as pool:
+            for model, field, prefix in TARGETS:
+                moved, skipped = self.migrate_model(model, field, prefix, pool, options)
+                self.stdout.write(f"{model.__name__}.{field}: moved {moved}, skipped {skipped}")
+
+    def migrate_model(self, model, field, prefix, pool, options):
+        default_name = model._meta.get_field(field).default
+        moved = skipped = 0
+        last_pk = 0
+        while True:
+            # Keyset pagination keeps every batch query cheap and the table unlocked in between.
+            batch = list(
+                model.objects.filter(pk__gt=last_pk).order_by("pk").values_list("pk", field)[:options["batch_size"]]
+            )
+            if not batch:
+                return moved, skipped
+            last_pk = batch[-1][0]
+
+            todo = [
+                (pk, name) for pk, name in batch
+                if name and name != default_name and not SHARDED_RE.match(name)
+            ]
+            if options["dry_run"]:
+                moved += len(todo)
+                continue
+
+            copies = [result for result in pool.map(lambda row: self.copy(row, prefix), todo) if result]
+            skipped += len(todo) - len(copies)
+
+            switched = []
+            with transaction.atomic():
+                for pk, old_name, new_name in copies:
+                    # Only switch rows that still point at the old file (the user may have replaced it meanwhile).
+                    if model.objects.filter(pk=pk, **{field: old_name}).update(**{field: new_name}):
+                        switched.append(old_name)
+                    else:
+                        default_storage.delete(new_name)
+                        skipped += 1
+            moved += len(switched)
+
+            if not options["keep_old"]:
+                list(pool.map(default_storage.delete, switched))
+
+    def copy(self, row, prefix):
+        pk, old_name = row
+        if not default_storage.exists(old_name):
+            self.stderr.write(f"missing file {old_name} (pk={pk})")
+            return None
+        with default_storage.open(old_name, "rb") as source:
+            new_name = default_storage.save(sharded_path(prefix, old_name), source)
+        return pk, old_name, new_name
@@ -0,0 +1,228 @@
+import cProfile
+import json
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils import timezone
+
+logger = logging.getLogger("myapp.requests")
+
+_current_metrics = ContextVar("request_metrics", default=None)
+
+
+# ---------------- REQUEST METRICS ----------------
+
+class RequestMetrics:
+    """Per-request counters filled in by the DB execute wrapper and the template hook."""
+
+    def __init__(self):
+        self.queries = []  # (sql, duration in seconds)
+        self.template_time = 0.0
+        self.rendering = False
+
+    def __call__(self, execute, sql, params, many, context):
+        # django.db execute_wrapper hook
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, time.perf_counter() - start))
+
+    @property
+    def sql_time(self):
+        return sum(duration for _, duration in self.queries)
+
+    def duplicates(self, threshold):
+        counts = Counter(sql for sql, _ in self.queries)
+        return {sql: count for sql, count in counts.items() if count >= threshold}
+
+
+def _instrument_templates():
+    # Time the outermost render() of each Django template; includes are part of it.
+    from django.template.backends.django import Template
+
+    if getattr(Template.render, "_request_metrics", False):
+        return
+    original_render = Template.render
+
+    def render(self, context=None, request=None):
+        metrics = _current_metrics.get()
+        if metrics is None or metrics.rendering:
+            return original_render(self, context, request)
+        metrics.rendering = True
+        start = time.perf_counter()
+        try:
+            return original_render(self, context, request)
+        finally:
+            metrics.template_time += time.perf_counter() - start
+            metrics.rendering = False
+
+    render._request_metrics = True
+    Template.render = render
+
+
+class RequestMetricsMiddleware:
+    """
+    Opt-in per-request instrumentation, enabled with REQUEST_METRICS_ENABLED.
+
+    Adds a Server-Timing header (db, tpl, view, total) and logs one JSON line per
+    request to the "myapp.requests" logger. Repeated identical SQL (N+1 patterns
+    such as images.first inside a loop) and requests slower than
+    REQUEST_METRICS_SLOW_MS are logged as warnings together with their SQL.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "REQUEST_METRICS_ENABLED", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.slow_ms = getattr(settings, "REQUEST_METRICS_SLOW_MS", 500)
+        self.duplicate_threshold = getattr(settings, "REQUEST_METRICS_DUPLICATE_THRESHOLD", 3)
+        _instrument_templates()
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        token = _current_metrics.set(metrics)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(metrics))
+                response = self.get_response(request)
+        finally:
+            _current_metrics.reset(token)
+        total_ms = (time.perf_counter() - start) * 1000
+
+        db_ms = metrics.sql_time * 1000
+        tpl_ms = metrics.template_time * 1000
+        view_ms = total_ms - tpl_ms
+        response.headers["Server-Timing"] = ", ".join([
+            f'db;dur={db_ms:.1f};desc="{len(metrics.queries)} queries"',
+            f"tpl;dur={tpl_ms:.1f}",
+            f"view;dur={view_ms:.1f}",
+            f"total;dur={total_ms:.1f}",
+        ])
+
+        duplicates = metrics.duplicates(self.duplicate_threshold)
+        record = {
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "queries": len(metrics.queries),
+            "duplicate_queries": sum(duplicates.values()),
+            "db_ms": round(db_ms, 1),
+            "template_ms": round(tpl_ms, 1),
+            "view_ms": round(view_ms, 1),
+            "total_ms": round(total_ms, 1),
+        }
+        logger.info(json.dumps(record))
+
+        if duplicates:
+            logger.warning(json.dumps({
+                "event": "duplicate_queries",
+                "path": request.path,
+                "queries": [{"sql": sql, "count": count} for sql, count in duplicates.items()],
+            }))
+        if total_ms >= self.slow_ms:
+            logger.warning(json.dumps({
+                "event": "slow_request",
+                **record,
+                "sql": [
+                    {"sql": sql, "ms": round(duration * 1000, 2)}
+                    for sql, duration in sorted(metrics.queries, key=lambda q: q[1], reverse=True)[:50]
+                ],
+            }))
+        return response
+
+
+# ---------------- ON-DEMAND PROFILER ----------------
+
+class ProfilerMiddleware:
+    """
+    Run a single request under cProfile when a superuser asks for it with
+    ?profile=1 or an "X-Profile: 1" header.
+
+    The .prof file is written to PROFILES_DIR and recorded as a RequestProfile
+    row so it shows up in the Django admin. Requests without the toggle only pay
+    for a header and query-string lookup; request.user is not touched.
+    Must sit after AuthenticationMiddleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not (request.headers.get("X-Profile") == "1" or request.GET.get("profile") == "1"):
+            return self.get_response(request)
+        if not request.user.is_superuser:
+            return self.get_response(request)
+        return self.profile(request)
+
+    def profile(self, request):
+        from .models import RequestProfile
+
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.disable()
+        duration_ms = (time.perf_counter() - start) * 1000
+
+        profiles_dir = settings.PROFILES_DIR
+        profiles_dir.mkdir(parents=True, exist_ok=True)
+        slug = re.sub(r"[^A-Za-z0-9]+", "-", request.path).strip("-") or "root"
+        filename = f"{timezone.now():%Y%m%d-%H%M%S-%f}-{request.method.lower()}-{slug[:80]}.prof"
+        profiler.dump_stats(profiles_dir / filename)
+
+        RequestProfile.objects.create(
+            user=request.user,
+            method=request.method,
+            path=request.get_full_path()[:500],
+            status_code=response.status_code,
+            duration_ms=duration_ms,
+            stats_file=filename,
+        )
+        response.headers["X-Profile-File"] = filename
+        return response
+
+
+# ---------------- READ SNAPSHOT ----------------
+
+class SnapshotMiddleware:
+    """
+    Tracks writes per request for the snapshot router (myapp/snapshot.py).
+    When a request wrote something the browser reads back (not just counters
+    or engagement events), the response carries a cookie with the write time
+    so the same browser keeps reading from the primary until a newer snapshot
+    exists.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "SNAPSHOT_REFRESH_SECONDS", 0):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        from .snapshot import WRITTEN_AT_COOKIE, RequestState, request_state, watch_writes
+
+        state = RequestState()
+        token = request_state.set(state)
+        try:
+            with connections[DEFAULT_DB_ALIAS].execute_wrapper(watch_writes):
+                response = self.get_response(request)
+        finally:
+            request_state.reset(token)
+        if state.wrote_seen:
+            response.set_cookie(
+                WRITTEN_AT_COOKIE, f"{time.time():.3f}",
+                max_age=settings.SNAPSHOT_MAX_AGE, httponly=True, samesite="Lax",
+            )
+        return response
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-19 12:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0012_requestprofile'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='trending_score',
+            field=models.FloatField(db_index=True, default=0),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='trending_score',
+            field=models.FloatField(db_index=True, default=0),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.7 on 2026-10-19 12:22
+
+import myapp.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0014_engagementevent_projectdailystats'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='profile',
+            name='profile_image',
+            field=models.ImageField(default='profiles/default.jpg', upload_to=myapp.models.profile_image_upload_to),
+        ),
+        migrations.AlterField(
+            model_name='projectimage',
+            name='image',
+            field=models.ImageField(upload_to=myapp.models.project_image_upload_to),
+        ),
+    ]
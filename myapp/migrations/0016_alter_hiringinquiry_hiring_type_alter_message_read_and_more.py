@@ -0,0 +1,34 @@
+# Generated by Django 5.2.7 on 2026-10-19 12:24
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0015_alter_profile_profile_image_alter_projectimage_image'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='hiringinquiry',
+            name='hiring_type',
+            field=models.CharField(choices=[('Freelancing', 'Freelancing'), ('Company', 'Company')], db_index=True, max_length=50),
+        ),
+        migrations.AlterField(
+            model_name='message',
+            name='read',
+            field=models.BooleanField(db_index=True, default=False),
+        ),
+        migrations.AlterField(
+            model_name='project',
+            name='visibility',
+            field=models.CharField(choices=[('Public', 'Public'), ('Private', 'Private')], db_index=True, default='Public', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['recipient', 'read'], name='myapp_messa_recipie_5c4a43_idx'),
+        ),
+    ]
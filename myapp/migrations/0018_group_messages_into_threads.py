@@ -0,0 +1,23 @@
+from django.db import migrations
+
+from myapp.inbox import group_messages_into_threads
+
+
+def forwards(apps, schema_editor):
+    group_messages_into_threads(apps.get_model("myapp", "Thread"), apps.get_model("myapp", "Message"))
+
+
+def backwards(apps, schema_editor):
+    apps.get_model("myapp", "Message").objects.update(thread=None)
+    apps.get_model("myapp", "Thread").objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("myapp", "0017_thread"),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
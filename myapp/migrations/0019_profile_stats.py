@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-19 12:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0018_group_messages_into_threads'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='project_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='total_likes',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='total_views',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,19 @@
+from django.db import migrations
+
+from myapp.profile_stats import stats_expressions
+
+
+def forwards(apps, schema_editor):
+    Profile = apps.get_model("myapp", "Profile")
+    Profile.objects.update(**stats_expressions(apps.get_model("myapp", "Project"), apps.get_model("myapp", "Like")))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("myapp", "0019_profile_stats"),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,30 @@
-from django.db import models
+import os
+import uuid
+
+from django.db import models, transaction
+from django.db.models import F, Q
 from django.contrib.auth.models import User
+from django.utils.text import Truncator
+
+
+def sharded_path(prefix, filename):
+    """
+    ``<prefix>/ab/cd/<32 hex chars>.<ext>``: random names spread over 65,536
+    directories, so no directory grows huge and storage never has to probe
+    for a free name.
+    """
+    name = uuid.uuid4().hex
+    extension = os.path.splitext(filename)[1].lower()
+    return f"{prefix}/{name[:2]}/{name[2:4]}/{name}{extension}"
+
+
+def project_image_upload_to(instance, filename):
+    return sharded_path("projects", filename)
+
+
+def profile_image_upload_to(instance, filename):
+    return sharded_path("profiles", filename)
+
 
 class Project(models.Model):
     VISIBILITY_CHOICES = [
@@ -18,11 +43,12 @@ class Project(models.Model):
     category = models.CharField(max_length=100)
     description = models.TextField(blank=True)
     tags = models.CharField(max_length=255, blank=True)  # comma-separated
-    visibility = models.CharField(max_length=20, choices=VISIBILITY_CHOICES, default="Public")
+    visibility = models.CharField(max_length=20, choices=VISIBILITY_CHOICES, default="Public", db_index=True)
     license = models.CharField(max_length=50, choices=LICENSE_CHOICES, default="All Rights Reserved")
     allow_downloads = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     views = models.PositiveIntegerField(default=0)
+    trending_score = models.FloatField(default=0, db_index=True)  # see myapp/trending.py
 
     def __str__(self):
         return f"{self.title} by {self.user.username}"
@@ -30,7 +56,7 @@ class Project(models.Model):
 
 class ProjectImage(models.Model):
     project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name="images")
-    image = models.ImageField(upload_to="projects/")
+    image = models.ImageField(upload_to=project_image_upload_to)
 
     def __str__(self):
         return f"Image for {self.project.title}"
@@ -48,8 +74,13 @@ class Profile(models.Model):
     mobile = models.CharField(max_length=15, blank=True)
     location = models.CharField(max_length=100, blank=True)
     address = models.TextField(blank=True)
-    profile_image = models.ImageField(upload_to="profiles/", default="profiles/default.jpg")
+    profile_image = models.ImageField(upload_to=profile_image_upload_to, default="profiles/default.jpg")
     appreciation_count = models.PositiveIntegerField(default=0) 
+    trending_score = models.FloatField(default=0, db_index=True)  # see myapp/trending.py
+    # Maintained totals, see myapp/profile_stats.py
+    project_count = models.PositiveIntegerField(default=0)
+    total_likes = models.PositiveIntegerField(default=0)
+    total_views = models.PositiveIntegerField(default=0)
 
     def __str__(self):
         return self.user.username
@@ -65,7 +96,7 @@ class HiringInquiry(models.Model):
     description = models.TextField()
     note = models.TextField(blank=True, null=True)
     hiring_type = models.CharField(
-        max_length=50, choices=[("Freelancing", "Freelancing"), ("Company", "Company")]
+        max_length=50, choices=[("Freelancing", "Freelancing"), ("Company", "Company")], db_index=True
     )
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -74,17 +105,112 @@ class HiringInquiry(models.Model):
 
 
 
+class ThreadQuerySet(models.QuerySet):
+    def for_user(self, user):
+        return self.filter(Q(user_low=user) | Q(user_high=user))
+
+
+class Thread(models.Model):
+    """
+    All messages about one project between the same two users. The last message
+    and each participant's unread count are copied here when a message is saved,
+    so the inbox never has to group the message table.
+    """
+    SNIPPET_LENGTH = 140
+
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name="threads")
+    # Participants in id order, so each pair maps to exactly one row.
+    user_low = models.ForeignKey(User, on_delete=models.CASCADE, related_name="+")
+    user_high = models.ForeignKey(User, on_delete=models.CASCADE, related_name="+")
+    last_message_at = models.DateTimeField(null=True, blank=True)
+    last_snippet = models.CharField(max_length=SNIPPET_LENGTH, blank=True)
+    last_sender = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+    message_count = models.PositiveIntegerField(default=0)
+    unread_low = models.PositiveIntegerField(default=0)
+    unread_high = models.PositiveIntegerField(default=0)
+
+    objects = ThreadQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["project", "user_low", "user_high"], name="unique_thread_per_pair"),
+        ]
+        indexes = [
+            models.Index(fields=["user_low", "-last_message_at"]),  # inbox listing
+            models.Index(fields=["user_high", "-last_message_at"]),
+        ]
+
+    def __str__(self):
+        return f"Thread on {self.project_id} between {self.user_low_id} and {self.user_high_id}"
+
+    @staticmethod
+    def participants(user_id, other_id):
+        return (user_id, other_id) if user_id <= other_id else (other_id, user_id)
+
+    def other_participant(self, user):
+        return self.user_high if self.user_low_id == user.id else self.user_low
+
+    def unread_for(self, user):
+        return self.unread_low if self.user_low_id == user.id else self.unread_high
+
+    @classmethod
+    def for_message(cls, message):
+        low, high = cls.participants(message.sender_id, message.recipient_id)
+        thread, _ = cls.objects.get_or_create(project_id=message.project_id, user_low_id=low, user_high_id=high)
+        return thread
+
+    @classmethod
+    def record_message(cls, message):
+        """Copy a newly saved message into its thread summary; runs in the message's transaction."""
+        unread_field = "unread_low" if message.recipient_id == message.thread.user_low_id else "unread_high"
+        cls.objects.filter(pk=message.thread_id).update(
+            last_message_at=message.created_at,
+            last_snippet=Truncator(message.content).chars(cls.SNIPPET_LENGTH),
+            last_sender_id=message.sender_id,
+            message_count=F("message_count") + 1,
+            **{unread_field: F(unread_field) + (0 if message.read else 1)},
+        )
+
+    @classmethod
+    def mark_read(cls, user, messages):
+        """Mark the user's unread ``messages`` read and clear their unread counts on the affected threads."""
+        with transaction.atomic():
+            unread = messages.filter(recipient=user, read=False)
+            thread_ids = set(unread.values_list("thread_id", flat=True))
+            unread.update(read=True)
+            cls.objects.filter(pk__in=thread_ids, user_low=user).update(unread_low=0)
+            cls.objects.filter(pk__in=thread_ids, user_high=user).update(unread_high=0)
+
+
 class Message(models.Model):
     project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name="messages")
     sender = models.ForeignKey(User, on_delete=models.CASCADE, related_name="sent_messages")
     recipient = models.ForeignKey(User, on_delete=models.CASCADE, related_name="received_messages")
+    thread = models.ForeignKey(Thread, on_delete=models.SET_NULL, null=True, blank=True, related_name="messages")
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
-    read = models.BooleanField(default=False)
+    read = models.BooleanField(default=False, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["recipient", "read"]),  # unread badge counts
+            models.Index(fields=["thread", "created_at"]),  # conversation page
+        ]
 
     def __str__(self):
         return f"Message from {self.sender.username} to {self.recipient.username} for {self.project.title}"
 
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            return super().save(*args, **kwargs)
+        # The message and its thread summary commit (or roll back) together.
+        with transaction.atomic():
+            if self.thread_id is None:
+                self.thread = Thread.for_message(self)
+            super().save(*args, **kwargs)
+            Thread.record_message(self)
+
+
 
 
 
@@ -133,3 +259,189 @@ class Like(models.Model):
 
     def __str__(self):
         return f"{self.user.username} liked {self.project.title}"
+
+
+
+class RequestProfile(models.Model):
+    """A cProfile run captured on demand by a superuser (see ProfilerMiddleware)."""
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    method = models.CharField(max_length=10)
+    path = models.CharField(max_length=500)
+    status_code = models.PositiveSmallIntegerField()
+    duration_ms = models.FloatField()
+    stats_file = models.CharField(max_length=255)  # relative to PROFILES_DIR
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.method} {self.path} ({self.duration_ms:.0f} ms)"
+
+
+
+class EngagementEvent(models.Model):
+    """Raw engagement log, appended in batches by myapp.engagement and pruned after rollup."""
+    VIEW, LIKE, UNLIKE, HIRE = 1, 2, 3, 4
+    EVENT_CHOICES = [
+        (VIEW, "View"),
+        (LIKE, "Like"),
+        (UNLIKE, "Unlike"),
+        (HIRE, "Hire inquiry"),
+    ]
+
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name="engagement_events")
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    event = models.PositiveSmallIntegerField(choices=EVENT_CHOICES)
+    created_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"{self.get_event_display()} on project {self.project_id}"
+
+
+class ProjectDailyStats(models.Model):
+    """Per-project, per-day engagement totals built by `manage.py rollup_engagement`."""
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name="daily_stats")
+    user = models.ForeignKey(User, on_delete=models.CASCADE)  # project owner, for per-student queries
+    day = models.DateField()
+    views = models.PositiveIntegerField(default=0)
+    likes = models.PositiveIntegerField(default=0)
+    unlikes = models.PositiveIntegerField(default=0)
+    inquiries = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["project", "day"], name="unique_project_day_stats"),
+        ]
+        indexes = [
+            models.Index(fields=["user", "day"]),
+        ]
+
+    def __str__(self):
+        return f"Stats for project {self.project_id} on {self.day}"
+
+
+
+from collections import defaultdict
+
+from django.db.models import Count
+from django.db.models.signals import post_delete, pre_delete
+
+
+def _deleted_with(origin, *senders):
+    """Whether a delete signal is part of deleting one of ``senders`` (an instance or a queryset)."""
+    model = origin.model if isinstance(origin, models.QuerySet) else type(origin)
+    return model in senders
+
+@receiver(post_save, sender=Like)
+def on_like_created(sender, instance, created, **kwargs):
+    if created:
+        from .engagement import log_event
+        from .profile_stats import adjust
+        from .trending import record_event
+        record_event(instance.project, "like", when=instance.created_at)  # on_like_deleted subtracts the same
+        adjust(instance.project.user_id, total_likes=1)
+        log_event(instance.project_id, instance.user_id, EngagementEvent.LIKE)
+
+@receiver(post_delete, sender=Like)
+def on_like_deleted(sender, instance, origin=None, **kwargs):
+    # Cascades are settled in bulk before they start (count_project_deleted,
+    # uncount_deleted_users_likes); there is nothing to log for rows about to go.
+    if _deleted_with(origin, Project, User):
+        return
+    from .engagement import log_event
+    from .profile_stats import adjust
+    from .trending import record_event
+    # Take back exactly what the like added when it was made, not a like's worth at today's weight.
+    record_event(instance.project, "unlike", when=instance.created_at)
+    adjust(instance.project.user_id, total_likes=-1)
+    log_event(instance.project_id, instance.user_id, EngagementEvent.UNLIKE)
+
+@receiver(post_save, sender=Project)
+def count_project_created(sender, instance, created, **kwargs):
+    if created:
+        from .profile_stats import adjust
+        adjust(instance.user_id, project_count=1, total_views=instance.views)
+
+@receiver(pre_delete, sender=Project)
+def count_project_deleted(sender, instance, origin=None, **kwargs):
+    if _deleted_with(origin, User):
+        return  # the owner's profile is deleted too
+    from .profile_stats import adjust
+    # Before the cascade, so the likes can still be counted; their own receivers skip it.
+    current = (
+        Project.objects.filter(pk=instance.pk)
+        .annotate(like_count=Count("likes"))
+        .values_list("views", "like_count", "trending_score")
+        .first()
+    )
+    if current is None:
+        return
+    views, like_count, trending_score = current
+    adjust(
+        instance.user_id,
+        project_count=-1, total_views=-views, total_likes=-like_count, trending_score=-trending_score,
+    )
+
+@receiver(pre_delete, sender=User)
+def uncount_deleted_users_likes(sender, instance, **kwargs):
+    """Take a deleted account's likes back from the other students' projects, grouped per project and owner."""
+    from .profile_stats import adjust
+    from .trending import event_score
+    scores = defaultdict(float)  # project id -> trending score to remove
+    owners = defaultdict(lambda: [0, 0.0])  # owner id -> [likes, trending score]
+    likes = (
+        Like.objects.filter(user=instance).exclude(project__user=instance)
+        .values_list("project_id", "project__user_id", "created_at")
+    )
+    for project_id, owner_id, created_at in likes.iterator():
+        score = event_score("like", created_at)
+        scores[project_id] += score
+        owners[owner_id][0] += 1
+        owners[owner_id][1] += score
+    for project_id, score in scores.items():
+        Project.objects.filter(pk=project_id).update(trending_score=F("trending_score") - score)
+    for owner_id, (like_count, score) in owners.items():
+        adjust(owner_id, total_likes=-like_count, trending_score=-score)
+
+@receiver(post_save, sender=HiringInquiry)
+def on_hire_inquiry_created(sender, instance, created, **kwargs):
+    if created:
+        from .engagement import log_event
+        from .trending import record_event
+        record_event(instance.project, "hire")
+        log_event(instance.project_id, instance.sender_id, EngagementEvent.HIRE)
+
+
+@receiver(post_save, sender=Message)
+def notify_recipient_on_message(sender, instance, created, **kwargs):
+    if created:
+        from .notifications import publish_new_message
+        publish_new_message(instance)
+
+
+@receiver(post_save, sender=Profile)
+def index_profile_name(sender, instance, **kwargs):
+    from .search import student_index
+    user = instance.user
+    transaction.on_commit(lambda: student_index.update(
+        instance.pk, instance.first_name, instance.last_name, user.username, not user.is_superuser,
+    ))
+
+@receiver(post_save, sender=User)
+def index_user_name(sender, instance, update_fields=None, **kwargs):
+    # Logins save last_login only; nothing the index cares about changed.
+    if update_fields is not None and not {"username", "is_superuser"} & set(update_fields):
+        return
+    from .search import student_index
+    row = Profile.objects.filter(user=instance).values_list("id", "first_name", "last_name").first()
+    if row:
+        transaction.on_commit(lambda: student_index.update(
+            *row, instance.username, not instance.is_superuser,
+        ))
+
+@receiver(post_delete, sender=Profile)
+def unindex_profile_name(sender, instance, **kwargs):
+    from .search import student_index
+    profile_id = instance.pk
+    transaction.on_commit(lambda: student_index.remove(profile_id))
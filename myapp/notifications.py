@@ -0,0 +1,87 @@
+"""
+In-process pub/sub for new-message notifications, consumed by the
+server-sent-events endpoint (views.notification_stream).
+
+Each open stream is one asyncio.Queue registered under the recipient's user id;
+an idle subscriber costs a queue and a sleeping coroutine, nothing else.
+Publishing happens after the Message transaction commits, from whatever thread
+saved it, and is handed to the subscriber's event loop with
+call_soon_threadsafe. Subscribers only see messages saved by the same worker
+process; with several workers a client simply gets events from the worker it
+is connected to, and its next page load picks up the rest.
+"""
+
+import asyncio
+import json
+import threading
+from collections import defaultdict
+
+from django.db import transaction
+
+
+class Broker:
+    def __init__(self):
+        self._subscribers = defaultdict(set)  # user id -> {(loop, queue)}
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id):
+        subscription = (asyncio.get_running_loop(), asyncio.Queue(maxsize=100))
+        with self._lock:
+            self._subscribers[user_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, user_id, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(user_id)
+            if subscribers:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[user_id]
+
+    def has_subscribers(self, user_id):
+        return bool(self._subscribers.get(user_id))
+
+    def publish(self, user_id, event, data):
+        with self._lock:
+            subscribers = list(self._subscribers.get(user_id, ()))
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(_offer, queue, (event, data))
+
+
+def _offer(queue, item):
+    # A client that stopped reading loses old events rather than growing memory.
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(item)
+
+
+broker = Broker()
+
+
+def format_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def publish_unread_count(user_id):
+    """Push the current unread count; skips the COUNT query when nobody is listening."""
+    from .models import Message
+
+    if broker.has_subscribers(user_id):
+        count = Message.objects.filter(recipient_id=user_id, read=False).count()
+        broker.publish(user_id, "unread", {"count": count})
+
+
+def publish_new_message(message):
+    def send():
+        if not broker.has_subscribers(message.recipient_id):
+            return
+        broker.publish(message.recipient_id, "message", {
+            "id": message.id,
+            "project_id": message.project_id,
+            "sender_id": message.sender_id,
+            "content": message.content[:140],
+            "created_at": message.created_at.isoformat(),
+        })
+        publish_unread_count(message.recipient_id)
+
+    transaction.on_commit(send)
@@ -0,0 +1,186 @@
+"""
+Bulk student onboarding from CSV or JSON.
+
+Used by the ``import_students`` management command and the admin upload on the
+"Create Student" page. Existing usernames are checked in one query, password
+hashing (the expensive part) is spread over a process pool, and User/Profile
+rows are inserted with bulk_create in chunks. Bad rows are reported and skipped;
+they never abort the rest of the batch.
+"""
+
+import csv
+import io
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.contrib.auth.models import User
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+
+from .models import Profile
+
+PROFILE_FIELDS = ("first_name", "last_name", "course", "mobile", "location", "address")
+DEFAULT_CHUNK_SIZE = 500
+
+
+class ImportResult:
+    def __init__(self):
+        self.created = []  # usernames
+        self.errors = []  # (row number, username, message)
+
+    def add_error(self, row_number, username, message):
+        self.errors.append((row_number, username, message))
+
+
+def read_rows(data, fmt):
+    """Parse uploaded bytes/str into a list of dicts. ``fmt`` is "csv" or "json"."""
+    if isinstance(data, bytes):
+        data = data.decode("utf-8-sig")
+    if fmt == "json":
+        rows = json.loads(data)
+        if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+            raise ValueError("JSON import must be a list of objects.")
+        return rows
+    if fmt == "csv":
+        return list(csv.DictReader(io.StringIO(data)))
+    raise ValueError(f"Unsupported format: {fmt}")
+
+
+def _init_worker():
+    # Workers started with "spawn" (macOS/Windows) need their own Django setup.
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+
+
+def _hash_password(password):
+    from django.contrib.auth.hashers import make_password
+
+    return make_password(password)
+
+
+def hash_passwords(passwords, workers=None):
+    """Hash passwords in parallel; ``workers=1`` hashes in-process."""
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(passwords) < 2:
+        return [_hash_password(password) for password in passwords]
+    chunksize = max(1, len(passwords) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        return list(pool.map(_hash_password, passwords, chunksize=chunksize))
+
+
+def _cell(row, field):
+    """A field's value as text. JSON numbers and booleans are converted; lists and objects are rejected."""
+    value = row.get(field)
+    if value is None:
+        return ""
+    if isinstance(value, (list, dict)):
+        raise ValueError(f"{field} must be a single value, not a list or object.")
+    return str(value)
+
+
+def _validate(rows, result):
+    """Return the rows that can be created, as (row number, cleaned dict)."""
+    validator = UnicodeUsernameValidator()
+    seen = set()
+    candidates = []
+    for number, row in enumerate(rows, start=1):
+        try:
+            cells = {field: _cell(row, field) for field in ("username", "password", *PROFILE_FIELDS)}
+        except ValueError as exc:
+            username = row.get("username")
+            result.add_error(number, username if isinstance(username, str) else "", str(exc))
+            continue
+        username = cells["username"].strip()
+        password = cells["password"]
+        if not username:
+            result.add_error(number, username, "Username is required.")
+            continue
+        if len(username) > 150:
+            result.add_error(number, username, "Username is longer than 150 characters.")
+            continue
+        try:
+            validator(username)
+        except ValidationError as exc:
+            result.add_error(number, username, " ".join(exc.messages))
+            continue
+        if not password:
+            result.add_error(number, username, "Password is required.")
+            continue
+        if username in seen:
+            result.add_error(number, username, "Duplicate username in this file.")
+            continue
+        cleaned = {"username": username, "password": password}
+        for field in PROFILE_FIELDS:
+            cleaned[field] = cells[field].strip()
+        too_long = [
+            field for field in PROFILE_FIELDS
+            if Profile._meta.get_field(field).max_length
+            and len(cleaned[field]) > Profile._meta.get_field(field).max_length
+        ]
+        if too_long:
+            result.add_error(number, username, f"Too long: {', '.join(too_long)}.")
+            continue
+        seen.add(username)
+        candidates.append((number, cleaned))
+
+    # One query for every username in the file instead of one exists() per row.
+    existing = set(User.objects.filter(username__in=seen).values_list("username", flat=True))
+    valid = []
+    for number, cleaned in candidates:
+        if cleaned["username"] in existing:
+            result.add_error(number, cleaned["username"], "Username already exists!")
+        else:
+            valid.append((number, cleaned))
+    return valid
+
+
+def _profile_for(user_id, cleaned):
+    return Profile(user_id=user_id, **{field: cleaned[field] for field in PROFILE_FIELDS})
+
+
+def _insert_chunk(chunk, result):
+    users = [User(username=cleaned["username"], password=cleaned["hash"]) for _, cleaned in chunk]
+    with transaction.atomic():
+        User.objects.bulk_create(users)
+        ids = dict(
+            User.objects.filter(username__in=[user.username for user in users]).values_list("username", "id")
+        )
+        Profile.objects.bulk_create([_profile_for(ids[cleaned["username"]], cleaned) for _, cleaned in chunk])
+    result.created.extend(user.username for user in users)
+
+
+def _insert_rows_one_by_one(chunk, result):
+    # Fallback when a chunk hits a conflict (e.g. a username created concurrently).
+    for number, cleaned in chunk:
+        try:
+            with transaction.atomic():
+                user = User.objects.create(username=cleaned["username"], password=cleaned["hash"])
+                _profile_for(user.id, cleaned).save()
+        except IntegrityError:
+            result.add_error(number, cleaned["username"], "Username already exists!")
+        else:
+            result.created.append(user.username)
+
+
+def import_students(rows, chunk_size=DEFAULT_CHUNK_SIZE, workers=None):
+    result = ImportResult()
+    valid = _validate(rows, result)
+
+    hashes = hash_passwords([cleaned["password"] for _, cleaned in valid], workers=workers)
+    for (_, cleaned), hashed in zip(valid, hashes):
+        cleaned["hash"] = hashed
+
+    for start in range(0, len(valid), chunk_size):
+        chunk = valid[start:start + chunk_size]
+        try:
+            _insert_chunk(chunk, result)
+        except IntegrityError:
+            _insert_rows_one_by_one(chunk, result)
+
+    result.errors.sort()
+    return result
@@ -0,0 +1,39 @@
+"""
+Per-student totals stored on Profile: project_count, total_likes, total_views.
+
+Project and Like receivers apply small deltas with ``adjust`` (the view counter
+folds its +1 into the trending-score UPDATE instead); pages read the columns
+directly instead of aggregating.
+``stats_expressions`` computes the true values from the source tables and is
+shared by the backfill migration (with historical models) and the
+``reconcile_profile_stats`` command, which repairs any drift.
+"""
+
+from django.db.models import Count, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Greatest
+
+STATS_FIELDS = ("project_count", "total_likes", "total_views")
+
+
+def adjust(user_id, **deltas):
+    """Add ``deltas`` (e.g. ``total_likes=1``) to the owner's profile in one UPDATE, never below zero."""
+    from .models import Profile
+
+    changes = {
+        field: Greatest(F(field) + delta, Value(0))
+        for field, delta in deltas.items()
+        if delta
+    }
+    if changes:
+        Profile.objects.filter(user_id=user_id).update(**changes)
+
+
+def stats_expressions(Project, Like):
+    """Correlated subqueries giving each Profile's true totals, for ``annotate()`` or ``update()``."""
+    projects = Project.objects.filter(user_id=OuterRef("user_id")).order_by().values("user_id")
+    likes = Like.objects.filter(project__user_id=OuterRef("user_id")).order_by().values("project__user_id")
+    return {
+        "project_count": Coalesce(Subquery(projects.annotate(n=Count("id")).values("n")), 0),
+        "total_likes": Coalesce(Subquery(likes.annotate(n=Count("id")).values("n")), 0),
+        "total_views": Coalesce(Subquery(projects.annotate(n=Sum("views")).values("n")), 0),
+    }
@@ -0,0 +1,161 @@
+"""
+In-memory prefix index of student names for the typeahead endpoint.
+
+Every student is indexed under their first name, last name, "first last" and
+username (lower-cased) in one sorted list; a prefix lookup is a bisect plus a
+short forward scan, so answering never touches the database. The index is
+built on first use (or at worker warm-up) with one query on the primary and
+kept current from Profile/User saves in this worker. Saves made by other
+workers are picked up by a rebuild once the index is STUDENT_INDEX_MAX_AGE
+seconds old; it runs in a background thread while searches keep using the
+current index, and saves made during the rebuild are replayed onto the result.
+"""
+
+import threading
+import time
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import Case, Value, When
+
+
+class StudentIndex:
+    def __init__(self, max_age):
+        self.max_age = max_age
+        self._keys = []  # sorted (key, profile id)
+        self._entries = {}  # profile id -> {"id", "name", "username"}
+        self._keys_by_profile = {}  # profile id -> keys it is indexed under
+        self._built_at = None
+        self._rebuilding = False
+        self._pending = []  # updates that arrived while a background rebuild was loading
+        self._lock = threading.Lock()
+
+    # ---- building ----
+
+    def _load(self):
+        from .models import Profile
+
+        # Always the primary: inside a request the router could send this to the snapshot.
+        rows = Profile.objects.using(DEFAULT_DB_ALIAS).filter(user__is_superuser=False).values_list(
+            "id", "first_name", "last_name", "user__username"
+        )
+        entries = {}
+        keys_by_profile = {}
+        keys = []
+        for profile_id, first_name, last_name, username in rows:
+            entries[profile_id] = self._entry(profile_id, first_name, last_name, username)
+            keys_by_profile[profile_id] = self._index_keys(first_name, last_name, username)
+            keys.extend((key, profile_id) for key in keys_by_profile[profile_id])
+        keys.sort()
+        return keys, entries, keys_by_profile
+
+    def ensure_built(self):
+        """Build the index if it never was; start a background rebuild if it is older than max_age."""
+        if self._built_at is None:
+            self._swap_in(*self._load())
+            return
+        if time.monotonic() - self._built_at < self.max_age:
+            return
+        with self._lock:
+            if self._rebuilding:
+                return
+            self._rebuilding = True
+        threading.Thread(target=self._rebuild, name="student-index-rebuild", daemon=True).start()
+
+    def _rebuild(self):
+        try:
+            self._swap_in(*self._load())
+        finally:
+            with self._lock:
+                self._rebuilding = False
+                self._pending = []
+            connections.close_all()  # this thread's own connection; the thread ends here
+
+    def _swap_in(self, keys, entries, keys_by_profile):
+        with self._lock:
+            self._keys, self._entries, self._keys_by_profile = keys, entries, keys_by_profile
+            self._built_at = time.monotonic()
+            for method, args in self._pending:
+                method(*args)
+            self._pending = []
+
+    @staticmethod
+    def _entry(profile_id, first_name, last_name, username):
+        name = f"{first_name} {last_name}".strip() or username
+        return {"id": profile_id, "name": name, "username": username}
+
+    @staticmethod
+    def _index_keys(first_name, last_name, username):
+        keys = {part.lower() for part in (first_name, last_name, username) if part}
+        full_name = f"{first_name} {last_name}".strip().lower()
+        if full_name:
+            keys.add(full_name)
+        return keys
+
+    # ---- incremental updates ----
+
+    def update(self, profile_id, first_name, last_name, username, is_student=True):
+        with self._lock:
+            if self._built_at is None:
+                return  # not built yet; the first search loads fresh data
+            self._update(profile_id, first_name, last_name, username, is_student)
+            if self._rebuilding:
+                self._pending.append((self._update, (profile_id, first_name, last_name, username, is_student)))
+
+    def remove(self, profile_id):
+        with self._lock:
+            if self._built_at is None:
+                return
+            self._remove(profile_id)
+            if self._rebuilding:
+                self._pending.append((self._remove, (profile_id,)))
+
+    def _update(self, profile_id, first_name, last_name, username, is_student):
+        self._remove(profile_id)
+        if is_student:
+            self._entries[profile_id] = self._entry(profile_id, first_name, last_name, username)
+            self._keys_by_profile[profile_id] = self._index_keys(first_name, last_name, username)
+            for key in self._keys_by_profile[profile_id]:
+                insort(self._keys, (key, profile_id))
+
+    def _remove(self, profile_id):
+        self._entries.pop(profile_id, None)
+        for key in self._keys_by_profile.pop(profile_id, ()):
+            index = bisect_left(self._keys, (key, profile_id))
+            if index < len(self._keys) and self._keys[index] == (key, profile_id):
+                del self._keys[index]
+
+    # ---- querying ----
+
+    def search(self, query, limit=10):
+        """Students with a name or username starting with ``query`` (``limit=None`` for all)."""
+        query = " ".join(query.lower().split())
+        if not query:
+            return []
+        self.ensure_built()
+        with self._lock:
+            found = []
+            seen = set()
+            index = bisect_left(self._keys, (query,))
+            while index < len(self._keys) and (limit is None or len(found) < limit):
+                key, profile_id = self._keys[index]
+                if not key.startswith(query):
+                    break
+                if profile_id not in seen:
+                    seen.add(profile_id)
+                    found.append(dict(self._entries[profile_id]))
+                index += 1
+        return sorted(found, key=lambda entry: entry["name"].lower())
+
+
+def in_result_order(queryset, matches):
+    """Narrow a Profile queryset to ``search`` results, keeping the order the index returned."""
+    ids = [match["id"] for match in matches]
+    if not ids:
+        return queryset.none()
+    position = Case(*(When(id=profile_id, then=Value(index)) for index, profile_id in enumerate(ids)))
+    return queryset.filter(id__in=ids).order_by(position)
+
+
+student_index = StudentIndex(max_age=settings.STUDENT_INDEX_MAX_AGE)
@@ -0,0 +1,179 @@
+"""
+Read-only snapshot of the database for read-heavy pages.
+
+``refresh_snapshot`` copies the primary database with SQLite's online backup
+API into a temporary file and renames it over SNAPSHOT_PATH, so readers see
+either the old copy or the new one, never a half-written file. The
+``refresh_snapshot`` management command runs it every SNAPSHOT_REFRESH_SECONDS
+(gunicorn.conf.py starts it next to the workers).
+
+Views opt in with ``@use_snapshot(max_age=...)``: on a GET whose snapshot is
+at most ``max_age`` seconds old, SnapshotRouter sends that request's reads of
+app and user tables to the ``snapshot`` alias. Everything else stays on the
+primary:
+
+* all writes, and every read after the first write in the same request;
+* non-GET requests and views without the decorator;
+* browsers that wrote something the current snapshot does not contain yet.
+  SnapshotMiddleware notices writes and sets a cookie with the write time,
+  and a snapshot is only used for that browser once it was taken afterwards.
+
+Bookkeeping writes that the browser does not read back -- view counters and
+trending scores, engagement events, sessions, ``last_login`` -- still move the
+rest of their own request to the primary but do not set the cookie; otherwise
+opening any project would keep that browser off the snapshot until the next
+refresh.
+"""
+
+import os
+import re
+import sqlite3
+import time
+from contextvars import ContextVar
+from functools import wraps
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+SNAPSHOT_ALIAS = "snapshot"
+SNAPSHOT_APPS = {"myapp", "auth"}  # sessions, admin log etc. always use the primary
+WRITTEN_AT_COOKIE = "db_written_at"
+WRITE_STATEMENTS = ("INSERT", "UPDATE", "DELETE", "REPLAC")
+
+# Writes the browser does not read back, so they never hold it off the snapshot:
+# tables written as a side effect of reading, and counter-only columns.
+UNSEEN_TABLES = {"myapp_engagementevent", "myapp_requestprofile", "django_session"}
+UNSEEN_COLUMNS = {
+    "myapp_project": {"views", "trending_score"},
+    "myapp_profile": {"total_views", "total_likes", "trending_score"},
+    "auth_user": {"last_login"},
+}
+
+_WRITE_TABLE = re.compile(r'^\s*(?:INSERT\s+(?:OR\s+\w+\s+)?INTO|UPDATE|DELETE\s+FROM|REPLACE\s+INTO)\s+"(\w+)"', re.I)
+_SET_COLUMN = re.compile(r'(?:\bSET|,)\s*"(\w+)"\s*=')
+
+
+class RequestState:
+    __slots__ = ("read_alias", "wrote", "wrote_seen")
+
+    def __init__(self):
+        self.read_alias = None
+        self.wrote = False  # any write: the rest of this request reads the primary
+        self.wrote_seen = False  # a write the browser reads back: SnapshotMiddleware sets the cookie
+
+
+request_state = ContextVar("snapshot_request_state", default=None)
+
+
+# ---- taking snapshots ----
+
+def refresh_snapshot(source=None):
+    """Copy the primary into SNAPSHOT_PATH and swap it in; returns the time the copy was taken."""
+    target = Path(settings.SNAPSHOT_PATH)
+    temporary = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+    taken_at = time.time()
+    own_source = source is None
+    if own_source:
+        primary = Path(settings.DATABASES[DEFAULT_DB_ALIAS]["NAME"])
+        source = sqlite3.connect(f"{primary.as_uri()}?mode=ro", uri=True)
+    try:
+        temporary.unlink(missing_ok=True)
+        copy = sqlite3.connect(temporary)
+        try:
+            # One step: a consistent copy without restarting when the primary is written meanwhile
+            # (under WAL the primary's writers are not blocked while it runs).
+            source.backup(copy)
+            copy.execute("PRAGMA journal_mode=DELETE")  # readers open it read-only, no -wal/-shm needed
+        finally:
+            copy.close()
+    finally:
+        if own_source:
+            source.close()
+    os.utime(temporary, (taken_at, taken_at))
+    os.replace(temporary, target)
+    return taken_at
+
+
+def snapshot_taken_at():
+    try:
+        return os.stat(settings.SNAPSHOT_PATH).st_mtime
+    except FileNotFoundError:
+        return None
+
+
+# ---- routing ----
+
+def _choose_snapshot(request, max_age):
+    state = request_state.get()
+    if state is None or request.method not in ("GET", "HEAD") or not settings.SNAPSHOT_REFRESH_SECONDS:
+        return
+    taken_at = snapshot_taken_at()
+    if taken_at is None or time.time() - taken_at > min(max_age, settings.SNAPSHOT_MAX_AGE):
+        return
+    try:
+        written_at = float(request.COOKIES.get(WRITTEN_AT_COOKIE, 0))
+    except ValueError:
+        written_at = 0
+    if written_at >= taken_at:
+        return  # this browser's last write is not in the snapshot yet
+    state.read_alias = SNAPSHOT_ALIAS
+
+
+def use_snapshot(max_age):
+    """Let the view read from a snapshot at most ``max_age`` seconds old (capped by SNAPSHOT_MAX_AGE)."""
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def wrapper(request, *args, **kwargs):
+                _choose_snapshot(request, max_age)
+                return await view(request, *args, **kwargs)
+        else:
+            @wraps(view)
+            def wrapper(request, *args, **kwargs):
+                _choose_snapshot(request, max_age)
+                return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def is_seen_write(sql):
+    """False for writes listed in UNSEEN_TABLES/UNSEEN_COLUMNS; anything unrecognised counts as seen."""
+    match = _WRITE_TABLE.match(sql)
+    if match is None:
+        return True
+    table = match.group(1)
+    if table in UNSEEN_TABLES:
+        return False
+    if table not in UNSEEN_COLUMNS or sql.lstrip()[:6].upper() != "UPDATE":
+        return True
+    columns = set(_SET_COLUMN.findall(sql))
+    return not columns or not columns <= UNSEEN_COLUMNS[table]
+
+
+def watch_writes(execute, sql, params, many, context):
+    """Connection execute wrapper: the first write of a request moves its remaining reads to the primary."""
+    state = request_state.get()
+    if state is not None and not state.wrote_seen and sql.lstrip()[:6].upper() in WRITE_STATEMENTS:
+        state.wrote = True
+        state.read_alias = None
+        state.wrote_seen = is_seen_write(sql)
+    return execute(sql, params, many, context)
+
+
+class SnapshotRouter:
+    def db_for_read(self, model, **hints):
+        state = request_state.get()
+        if state is not None and state.read_alias and model._meta.app_label in SNAPSHOT_APPS:
+            return state.read_alias
+        return None
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True  # the snapshot holds the same rows as the primary
+
+    def allow_migrate(self, db, app_label, **hints):
+        return False if db == SNAPSHOT_ALIAS else None
@@ -0,0 +1,27 @@
+// Student project upload: click or drag files onto the upload box.
+document.addEventListener("DOMContentLoaded", function () {
+  const fileInput = document.getElementById('fileInput');
+  const uploadBox = document.getElementById('uploadBox');
+  const fileList = document.getElementById('fileList');
+  if (!fileInput || !uploadBox) {
+    return;  // admin dashboard has no upload form
+  }
+
+  uploadBox.addEventListener('click', () => fileInput.click());
+
+  fileInput.addEventListener('change', updateFileList);
+
+  uploadBox.addEventListener('dragover', (e) => { e.preventDefault(); uploadBox.style.borderColor = '#ff69b4'; });
+  uploadBox.addEventListener('dragleave', (e) => { e.preventDefault(); uploadBox.style.borderColor = '#ccc'; });
+  uploadBox.addEventListener('drop', (e) => {
+    e.preventDefault();
+    fileInput.files = e.dataTransfer.files;
+    updateFileList();
+    uploadBox.style.borderColor = '#ccc';
+  });
+
+  function updateFileList() {
+    const files = Array.from(fileInput.files);
+    fileList.innerHTML = files.map(f => `<div>${f.name}</div>`).join('');
+  }
+});
@@ -0,0 +1,27 @@
+// Like / unlike toggle on the project detail page.
+document.addEventListener("DOMContentLoaded", function () {
+  const likeButton = document.getElementById("like-btn");
+  if (!likeButton) {
+    return;
+  }
+
+  likeButton.addEventListener("click", function () {
+    fetch("", {
+      method: "POST",
+      headers: {
+        "X-CSRFToken": likeButton.dataset.csrf,
+        "Content-Type": "application/x-www-form-urlencoded"
+      },
+      body: "action=like"
+    })
+    .then(response => response.json())
+    .then(data => {
+      const likeText = document.getElementById("like-text");
+      const likeCount = document.getElementById("like-count");
+      likeText.textContent = data.liked ? "Liked" : "Like";
+      if (likeCount) {
+        likeCount.textContent = data.like_count + " Appreciations";
+      }
+    });
+  });
+});
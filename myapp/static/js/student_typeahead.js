@@ -0,0 +1,35 @@
+// Student name suggestions for inputs marked with data-typeahead-url.
+document.addEventListener("DOMContentLoaded", function () {
+  document.querySelectorAll('input[data-typeahead-url]').forEach((input) => {
+    const list = document.getElementById(input.getAttribute('list'));
+    let timer = null;
+    let controller = null;
+
+    input.addEventListener('input', () => {
+      clearTimeout(timer);
+      timer = setTimeout(suggest, 120);
+    });
+
+    function suggest() {
+      const q = input.value.trim();
+      if (!q) {
+        list.innerHTML = '';
+        return;
+      }
+      if (controller) controller.abort();
+      controller = new AbortController();
+      fetch(`${input.dataset.typeaheadUrl}?q=${encodeURIComponent(q)}`, { signal: controller.signal })
+        .then((response) => response.json())
+        .then((data) => {
+          list.innerHTML = '';
+          data.results.forEach((student) => {
+            const option = document.createElement('option');
+            option.value = student.name;
+            option.label = student.username;
+            list.appendChild(option);
+          });
+        })
+        .catch(() => {});
+    }
+  });
+});
@@ -0,0 +1,37 @@
+"""
+Response bodies for StreamingHttpResponse that stream under both servers.
+
+Under ASGI, Django cannot iterate a synchronous iterator on the event loop, so
+it reads the whole thing into memory before sending the first byte. For
+requests that came in through ASGI, ``streaming_body`` wraps the generator in
+an async iterator that pulls one chunk at a time through sync_to_async, which
+keeps exports and zip downloads at one chunk in memory there too. Under WSGI
+the generator is returned unchanged.
+"""
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+
+_DONE = object()
+
+
+def streaming_body(request, chunks):
+    if not isinstance(request, ASGIRequest):
+        return chunks
+    return _pull(iter(chunks))
+
+
+async def _pull(iterator):
+    # thread_sensitive: the generator runs its queries on the thread (and connection) the sync view used.
+    next_chunk = sync_to_async(next, thread_sensitive=True)
+    try:
+        while True:
+            chunk = await next_chunk(iterator, _DONE)
+            if chunk is _DONE:
+                return
+            yield chunk
+    finally:
+        # Client went away mid-stream: let the generator run its cleanup (temp files, open images).
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            await sync_to_async(close, thread_sensitive=True)()
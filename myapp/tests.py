@@ -1,3 +1,617 @@
-from django.test import TestCase
+import io
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.hashers import check_password
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .downloads import _serve_cached
+from .inbox import group_messages_into_threads
+from .middleware import SnapshotMiddleware
+from .models import EngagementEvent, HiringInquiry, Like, Message, Profile, Project, Thread
+from .onboarding import ImportResult, _validate, import_students
+from .profile_stats import STATS_FIELDS, adjust, stats_expressions
+from .search import StudentIndex, in_result_order
+from .snapshot import (
+    SNAPSHOT_ALIAS, WRITTEN_AT_COOKIE, RequestState, SnapshotRouter, _choose_snapshot, is_seen_write,
+    request_state, watch_writes,
+)
+from .storage import MinifiedManifestStaticFilesStorage
+from .trending import event_score
+
+
+class ServeCachedArchiveTests(SimpleTestCase):
+    etag = '"abc123"'
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / "archive.zip"
+        self.data = bytes(range(256)) * 4  # 1024 bytes
+        self.path.write_bytes(self.data)
+        self.factory = RequestFactory()
+
+    def serve(self, **headers):
+        request = self.factory.get("/download/", headers=headers)
+        return _serve_cached(request, self.path, self.etag, "archive.zip")
+
+    def test_full_download(self):
+        response = self.serve()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), self.data)
+        self.assertEqual(response["Content-Length"], "1024")
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertEqual(response["ETag"], self.etag)
+        self.assertFalse(response.has_header("Content-Range"))
+
+    def test_if_none_match(self):
+        response = self.serve(if_none_match=self.etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_closed_range(self):
+        response = self.serve(range="bytes=100-199")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b"".join(response.streaming_content), self.data[100:200])
+        self.assertEqual(response["Content-Range"], "bytes 100-199/1024")
+        self.assertEqual(response["Content-Length"], "100")
+
+    def test_open_ended_range(self):
+        response = self.serve(range="bytes=1000-")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b"".join(response.streaming_content), self.data[1000:])
+        self.assertEqual(response["Content-Range"], "bytes 1000-1023/1024")
+
+    def test_range_end_is_clamped_to_size(self):
+        response = self.serve(range="bytes=1000-5000")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], "bytes 1000-1023/1024")
+
+    def test_suffix_range(self):
+        response = self.serve(range="bytes=-24")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b"".join(response.streaming_content), self.data[-24:])
+        self.assertEqual(response["Content-Range"], "bytes 1000-1023/1024")
+
+    def test_unsatisfiable_range(self):
+        for header in ("bytes=1024-", "bytes=2000-3000", "bytes=500-100"):
+            with self.subTest(header):
+                response = self.serve(range=header)
+                self.assertEqual(response.status_code, 416)
+                self.assertEqual(response["Content-Range"], "bytes */1024")
+
+    def test_malformed_range_sends_everything(self):
+        for header in ("bytes=-", "items=0-10", "bytes=0-10,20-30"):
+            with self.subTest(header):
+                response = self.serve(range=header)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response["Content-Length"], "1024")
+
+    def test_if_range_matching_etag(self):
+        response = self.serve(range="bytes=0-9", if_range=self.etag)
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b"".join(response.streaming_content), self.data[:10])
+
+    def test_if_range_stale_etag_sends_everything(self):
+        response = self.serve(range="bytes=0-9", if_range='"old"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), self.data)
+
+
+class ManifestStaticPagesTests(TestCase):
+    """Pages render against a collected manifest, as in production (DEBUG off, strict manifest)."""
+
+    @classmethod
+    def setUpClass(cls):
+        static_root = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(static_root.cleanup)
+        cls.enterClassContext(override_settings(STATIC_ROOT=static_root.name))
+        call_command("collectstatic", interactive=False, verbosity=0)
+        super().setUpClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create(username="admin", is_superuser=True, is_staff=True)
+        cls.student = User.objects.create(username="student")
+        Profile.objects.create(user=cls.admin, first_name="Site", last_name="Admin")
+        cls.profile = Profile.objects.create(user=cls.student, first_name="Asha", last_name="Rao")
+        # Creating a project also messages the admin, which opens a thread.
+        cls.project = Project.objects.create(user=cls.student, title="Poster", category="Branding")
+        cls.thread = Thread.objects.get(project=cls.project)
+
+    def assertRenders(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+
+    def test_uses_manifest_storage(self):
+        self.assertIsInstance(staticfiles_storage._wrapped, MinifiedManifestStaticFilesStorage)
+        self.assertTrue(staticfiles_storage.manifest_strict)
+
+    def test_anonymous_pages(self):
+        for name in ("login", "admin_login", "student_login"):
+            with self.subTest(name):
+                self.assertRenders(reverse(name))
+
+    def test_admin_pages(self):
+        self.client.force_login(self.admin)
+        for url in (
+            reverse("dashboard"),
+            reverse("create_student"),
+            reverse("my_projects"),
+            reverse("project_detail", args=[self.project.pk]),
+            reverse("view_student_projects", args=[self.profile.pk]),
+            reverse("all_messages"),
+            reverse("inbox"),
+            reverse("thread_detail", args=[self.thread.pk]),
+        ):
+            with self.subTest(url):
+                self.assertRenders(url)
+
+    def test_student_pages(self):
+        self.client.force_login(self.student)
+        for url in (
+            reverse("dashboard"),
+            reverse("edit_profile"),
+            reverse("project_detail", args=[self.project.pk]),
+            reverse("all_messages"),
+            reverse("inbox"),
+            reverse("thread_detail", args=[self.thread.pk]),
+        ):
+            with self.subTest(url):
+                self.assertRenders(url)
+
+
+class ThreadSummaryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create(username="owner")
+        cls.client_user = User.objects.create(username="client")
+        cls.other = User.objects.create(username="other")
+        cls.project = Project.objects.create(user=cls.owner, title="Poster", category="Branding")
+
+    def send(self, sender, recipient, content="Hello", **kwargs):
+        return Message.objects.create(
+            project=self.project, sender=sender, recipient=recipient, content=content, **kwargs
+        )
+
+    def thread_state(self, thread):
+        return (
+            thread.project_id, thread.user_low_id, thread.user_high_id, thread.message_count,
+            thread.unread_low, thread.unread_high, thread.last_message_at, thread.last_snippet,
+            thread.last_sender_id,
+        )
+
+    def test_both_directions_share_one_thread(self):
+        first = self.send(self.client_user, self.owner)
+        reply = self.send(self.owner, self.client_user)
+        self.assertEqual(first.thread_id, reply.thread_id)
+        self.assertEqual(Thread.objects.count(), 1)
+
+    def test_counters_follow_saved_messages(self):
+        self.send(self.client_user, self.owner, "First")
+        self.send(self.client_user, self.owner, "Second")
+        self.send(self.owner, self.client_user, "x" * 300)
+        self.send(self.client_user, self.owner, "Already seen", read=True)
+
+        thread = Thread.objects.get()
+        self.assertEqual(thread.message_count, 4)
+        self.assertEqual(thread.unread_for(self.owner), 2)
+        self.assertEqual(thread.unread_for(self.client_user), 1)
+        self.assertEqual(thread.last_snippet, "Already seen")
+        self.assertEqual(thread.last_sender_id, self.client_user.id)
+        self.assertEqual(thread.other_participant(self.owner), self.client_user)
+
+    def test_snippet_is_truncated(self):
+        self.send(self.owner, self.client_user, "x" * 300)
+        self.assertEqual(len(Thread.objects.get().last_snippet), Thread.SNIPPET_LENGTH)
+
+    def test_mark_read_clears_only_the_readers_count(self):
+        thread = self.send(self.client_user, self.owner).thread
+        self.send(self.client_user, self.owner)
+        self.send(self.owner, self.client_user)
+        self.send(self.other, self.owner)
+
+        Thread.mark_read(self.owner, Message.objects.filter(sender=self.client_user))
+
+        thread.refresh_from_db()
+        self.assertEqual(thread.unread_for(self.owner), 0)
+        self.assertEqual(thread.unread_for(self.client_user), 1)
+        self.assertFalse(Message.objects.filter(recipient=self.owner, sender=self.client_user, read=False).exists())
+        # Messages outside the queryset and their thread are untouched.
+        other_thread = Thread.objects.exclude(pk=thread.pk).get()
+        self.assertEqual(other_thread.unread_for(self.owner), 1)
+
+    def test_backfill_matches_threads_built_on_save(self):
+        self.send(self.client_user, self.owner, "First")
+        self.send(self.owner, self.client_user, "Reply")
+        self.send(self.client_user, self.owner, "x" * 300)
+        self.send(self.other, self.owner, "Seen", read=True)
+        self.send(self.other, self.owner, "Unseen")
+        expected = sorted(self.thread_state(thread) for thread in Thread.objects.all())
+
+        Message.objects.update(thread=None)
+        Thread.objects.all().delete()
+        created = group_messages_into_threads(Thread, Message)
+
+        self.assertEqual(created, 2)
+        self.assertEqual(sorted(self.thread_state(thread) for thread in Thread.objects.all()), expected)
+        self.assertFalse(Message.objects.filter(thread__isnull=True).exists())
+        for message in Message.objects.select_related("thread"):
+            self.assertEqual(
+                (message.thread.user_low_id, message.thread.user_high_id),
+                Thread.participants(message.sender_id, message.recipient_id),
+            )
+
+    def test_backfill_of_bulk_created_messages(self):
+        # bulk_create skips Message.save, as the rows that existed before threads did.
+        Message.objects.bulk_create([
+            Message(project=self.project, sender=self.client_user, recipient=self.owner, content="One"),
+            Message(project=self.project, sender=self.owner, recipient=self.client_user, content="Two"),
+        ])
+        self.assertEqual(group_messages_into_threads(Thread, Message), 1)
+        thread = Thread.objects.get()
+        self.assertEqual(thread.message_count, 2)
+        self.assertEqual(thread.unread_for(self.owner), 1)
+        self.assertEqual(thread.unread_for(self.client_user), 1)
+        self.assertEqual(thread.last_snippet, "Two")
+        self.assertEqual(thread.messages.count(), 2)
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class StudentImportTests(TestCase):
+    def validate(self, rows):
+        result = ImportResult()
+        valid = _validate(rows, result)
+        return valid, result.errors
+
+    def test_json_numbers_are_read_as_text(self):
+        valid, errors = self.validate([{"username": 1001, "password": 1234, "mobile": 9876543210}])
+        self.assertEqual(errors, [])
+        (number, cleaned), = valid
+        self.assertEqual((number, cleaned["username"], cleaned["password"]), (1, "1001", "1234"))
+        self.assertEqual(cleaned["mobile"], "9876543210")
+        self.assertEqual(cleaned["first_name"], "")
+
+    def test_lists_and_objects_are_row_errors(self):
+        valid, errors = self.validate([
+            {"username": "a1", "password": ["pw"]},
+            {"username": {"name": "a2"}, "password": "pw"},
+            {"username": "a3", "password": "pw", "course": {"id": 1}},
+            {"username": "a4", "password": "pw"},
+        ])
+        self.assertEqual([cleaned["username"] for _, cleaned in valid], ["a4"])
+        self.assertEqual([(number, username) for number, username, _ in errors], [(1, "a1"), (2, ""), (3, "a3")])
+        self.assertIn("password", errors[0][2])
+
+    def test_row_checks(self):
+        User.objects.create(username="taken")
+        valid, errors = self.validate([
+            {"username": "  ", "password": "pw"},
+            {"username": "no spaces allowed", "password": "pw"},
+            {"username": "nopass", "password": ""},
+            {"username": "taken", "password": "pw"},
+            {"username": "twice", "password": "pw"},
+            {"username": "twice", "password": "pw"},
+            {"username": "long", "password": "pw", "mobile": "1" * 16},
+        ])
+        self.assertEqual([cleaned["username"] for _, cleaned in valid], ["twice"])
+        messages = {number: message for number, _, message in errors}
+        self.assertEqual(sorted(messages), [1, 2, 3, 4, 6, 7])
+        self.assertEqual(messages[1], "Username is required.")
+        self.assertIn("Enter a valid username", messages[2])
+        self.assertEqual(messages[3], "Password is required.")
+        self.assertEqual(messages[4], "Username already exists!")
+        self.assertEqual(messages[6], "Duplicate username in this file.")
+        self.assertEqual(messages[7], "Too long: mobile.")
+
+    def test_import_creates_users_and_profiles(self):
+        rows = [
+            {"username": "s1", "password": "pw1", "first_name": "Asha", "mobile": 9876543210},
+            {"username": "s2", "password": "pw2", "course": ["bad"]},
+            {"username": 3, "password": "pw3"},
+        ]
+        result = import_students(rows, chunk_size=1, workers=1)
+
+        self.assertEqual(sorted(result.created), ["3", "s1"])
+        self.assertEqual([(number, username) for number, username, _ in result.errors], [(2, "s2")])
+        user = User.objects.get(username="s1")
+        self.assertTrue(check_password("pw1", user.password))
+        self.assertEqual((user.profile.first_name, user.profile.mobile), ("Asha", "9876543210"))
+        self.assertTrue(Profile.objects.filter(user__username="3").exists())
+
+    def test_conflicting_chunk_falls_back_to_single_rows(self):
+        rows = [{"username": "c1", "password": "pw"}, {"username": "c2", "password": "pw"}]
+        valid = _validate(rows, ImportResult())
+        User.objects.create(username="c2")  # created after validation, as by a concurrent request
+        with mock.patch("myapp.onboarding._validate", return_value=valid):
+            result = import_students(rows, workers=1)
+        self.assertEqual(result.created, ["c1"])
+        self.assertEqual(result.errors, [(2, "c2", "Username already exists!")])
+
+
+class LikeDeletionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create(username="owner")
+        cls.owner_profile = Profile.objects.create(user=cls.owner)
+        cls.fans = [User.objects.create(username=f"fan{i}") for i in range(5)]
+        for fan in cls.fans:
+            Profile.objects.create(user=fan)
+        cls.project = Project.objects.create(user=cls.owner, title="Poster", category="Branding", views=7)
+        cls.other_project = Project.objects.create(user=cls.owner, title="Logo", category="Branding")
+
+    def like(self, user, project=None):
+        return Like.objects.create(user=user, project=project or self.project)
+
+    @staticmethod
+    def logged_events(callbacks):
+        return [callback for callback in callbacks if "log_event" in callback.__qualname__]
+
+    def owner_totals(self):
+        return Profile.objects.values_list("project_count", "total_likes", "total_views").get(pk=self.owner_profile.pk)
+
+    def test_unlike_takes_back_the_original_score(self):
+        like = self.like(self.fans[0])
+        Like.objects.filter(pk=like.pk).update(created_at=like.created_at - timedelta(days=30))
+        Project.objects.filter(pk=self.project.pk).update(trending_score=event_score("like", like.created_at - timedelta(days=30)))
+        Profile.objects.filter(pk=self.owner_profile.pk).update(trending_score=0)
+
+        Like.objects.get(pk=like.pk).delete()
+
+        self.project.refresh_from_db()
+        self.assertAlmostEqual(self.project.trending_score, 0, delta=1e-6)
+        self.assertEqual(self.owner_totals()[1], 0)
+
+    def test_project_delete_settles_owner_totals_in_a_few_queries(self):
+        for fan in self.fans:
+            self.like(fan)
+        self.like(self.fans[0], self.other_project)
+        before = Profile.objects.get(pk=self.owner_profile.pk)
+        project = Project.objects.get(pk=self.project.pk)
+        self.assertEqual(before.total_likes, 6)
+
+        with self.captureOnCommitCallbacks(execute=False) as callbacks, CaptureQueriesContext(connection) as queries:
+            project.delete()
+
+        after = Profile.objects.get(pk=self.owner_profile.pk)
+        self.assertEqual((after.project_count, after.total_likes, after.total_views), (1, 1, 0))
+        remaining = Project.objects.get(pk=self.other_project.pk).trending_score
+        self.assertAlmostEqual(after.trending_score, remaining, delta=remaining * 1e-12)
+        self.assertEqual(self.logged_events(callbacks), [])  # no UNLIKE events for likes that went with the project
+        # Independent of the number of likes: nothing runs per like.
+        self.assertLess(len(queries), 20)
+
+    def test_account_delete_takes_its_likes_back_from_other_students(self):
+        self.like(self.fans[0])
+        self.like(self.fans[0], self.other_project)
+        self.like(self.fans[1])
+
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            self.fans[0].delete()
+
+        totals = self.owner_totals()
+        self.assertEqual(totals[1], 1)
+        self.assertEqual(self.logged_events(callbacks), [])
+        project = Project.objects.get(pk=self.project.pk)
+        expected = event_score("like", Like.objects.get(user=self.fans[1]).created_at)
+        self.assertAlmostEqual(project.trending_score, expected, delta=expected * 1e-12)
+        self.assertLess(Project.objects.get(pk=self.other_project.pk).trending_score, expected * 1e-12)
+
+
+class StudentIndexTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.profiles = {}
+        for username, first_name, last_name in [
+            ("asha", "Asha", "Rao"), ("arun", "Arun", "Kumar"), ("bala", "Bala", "Asokan"),
+        ]:
+            user = User.objects.create(username=username)
+            cls.profiles[username] = Profile.objects.create(user=user, first_name=first_name, last_name=last_name)
+        admin = User.objects.create(username="admin_asa", is_superuser=True)
+        Profile.objects.create(user=admin, first_name="Asa")
+
+    def setUp(self):
+        self.index = StudentIndex(max_age=60)
+
+    def names(self, query, **kwargs):
+        return [entry["name"] for entry in self.index.search(query, **kwargs)]
+
+    def test_prefix_search_on_any_name_part(self):
+        self.assertEqual(self.names("as"), ["Asha Rao", "Bala Asokan"])
+        self.assertEqual(self.names("asha r"), ["Asha Rao"])
+        self.assertEqual(self.names("A", limit=1), ["Arun Kumar"])
+        self.assertEqual(self.names("  "), [])
+
+    def test_updates_and_removals(self):
+        self.index.ensure_built()
+        asha = self.profiles["asha"]
+        self.index.update(asha.id, "Asha", "Menon", "asha")
+        self.assertEqual(self.names("menon"), ["Asha Menon"])
+        self.assertEqual(self.names("rao"), [])
+        self.index.remove(asha.id)
+        self.assertEqual(self.names("asha"), [])
+
+    def test_stale_index_is_rebuilt_in_the_background(self):
+        self.index.ensure_built()
+        self.index._built_at -= 120
+        with mock.patch("myapp.search.threading.Thread") as thread:
+            self.assertEqual(self.names("arun"), ["Arun Kumar"])  # answered from the current index
+            self.assertEqual(self.names("arun"), ["Arun Kumar"])
+        thread.assert_called_once()  # one rebuild at a time
+        self.assertEqual(thread.call_args.kwargs["target"], self.index._rebuild)
+
+    def test_saves_during_a_rebuild_are_replayed(self):
+        self.index.ensure_built()
+        loaded = self.index._load()  # what the rebuild read, before the save below
+        self.index._rebuilding = True
+        self.index.update(self.profiles["bala"].id, "Bala", "Krishnan", "bala")
+        self.index._swap_in(*loaded)
+        self.assertEqual(self.names("krishnan"), ["Bala Krishnan"])
+        self.assertEqual(self.names("asokan"), [])
+
+    def test_in_result_order_keeps_index_order(self):
+        ids = [self.profiles[name].id for name in ("bala", "asha", "arun")]
+        matches = [{"id": profile_id} for profile_id in ids]
+        self.assertEqual([p.id for p in in_result_order(Profile.objects.all(), matches)], ids)
+        self.assertEqual(list(in_result_order(Profile.objects.all(), [])), [])
+
+
+class ProfileStatsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = User.objects.create(username="student")
+        cls.profile = Profile.objects.create(user=cls.student, first_name="Asha")
+        cls.fans = [User.objects.create(username=f"fan{i}") for i in range(3)]
+
+    def stored(self):
+        return Profile.objects.values_list(*STATS_FIELDS).get(pk=self.profile.pk)
+
+    def actual(self):
+        expressions = stats_expressions(Project, Like)
+        return tuple(
+            Profile.objects.annotate(**{f"actual_{f}": e for f, e in expressions.items()})
+            .values_list(*(f"actual_{f}" for f in STATS_FIELDS)).get(pk=self.profile.pk)
+        )
+
+    def test_totals_follow_projects_likes_and_views(self):
+        from .views import _count_view
+
+        first = Project.objects.create(user=self.student, title="Poster", category="Branding", views=4)
+        second = Project.objects.create(user=self.student, title="Logo", category="Branding")
+        for fan in self.fans:
+            Like.objects.create(user=fan, project=first)
+        Like.objects.create(user=self.fans[0], project=second)
+        Like.objects.get(user=self.fans[1], project=first).delete()
+        with mock.patch("myapp.views.write_throttle.allow", return_value=True):
+            _count_view(second, self.fans[2])
+            _count_view(second, self.fans[1])
+        self.assertEqual(self.stored(), (2, 3, 6))
+        self.assertEqual(self.stored(), self.actual())
+
+        first.delete()
+        self.assertEqual(self.stored(), (1, 1, 2))
+        self.assertEqual(self.stored(), self.actual())
+
+    def test_adjust_never_goes_below_zero(self):
+        adjust(self.student.id, total_likes=-5, project_count=0)
+        self.assertEqual(self.stored(), (0, 0, 0))
+
+    def test_reconcile_repairs_drift(self):
+        Project.objects.create(user=self.student, title="Poster", category="Branding", views=3)
+        Profile.objects.filter(pk=self.profile.pk).update(project_count=9, total_views=0)
+        call_command("reconcile_profile_stats", stdout=io.StringIO())
+        self.assertEqual(self.stored(), (1, 0, 3))
+
+    def test_edit_profile_does_not_write_back_stale_totals(self):
+        project = Project.objects.create(user=self.student, title="Poster", category="Branding")
+        stale = Profile.objects.get(pk=self.profile.pk)
+        Like.objects.create(user=self.fans[0], project=project)  # lands after the view loaded the profile
+        self.client.force_login(self.student)
+        with mock.patch("myapp.views.Profile.objects.get_or_create", return_value=(stale, False)):
+            response = self.client.post(reverse("edit_profile"), {"first_name": "Asha", "last_name": "Rao"})
+        self.assertEqual(response.status_code, 302)
+        profile = Profile.objects.get(pk=self.profile.pk)
+        self.assertEqual((profile.last_name, profile.project_count, profile.total_likes), ("Rao", 1, 1))
+
+    def test_hire_inquiry_bumps_appreciation_without_touching_totals(self):
+        project = Project.objects.create(user=self.student, title="Poster", category="Branding")
+        Like.objects.create(user=self.fans[0], project=project)
+        self.client.force_login(self.fans[1])
+        response = self.client.post(reverse("hire_now", args=[project.pk]), {
+            "hiring_for": "Logo", "categories": "Branding", "budget": "100", "description": "Hi",
+            "hiring_type": "Freelancing",
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(HiringInquiry.objects.filter(project=project).count(), 1)
+        profile = Profile.objects.get(pk=self.profile.pk)
+        self.assertEqual((profile.appreciation_count, profile.project_count, profile.total_likes), (1, 1, 1))
+
+
+class SnapshotRoutingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = User.objects.create(username="student")
+        Profile.objects.create(user=cls.student)
+        cls.project = Project.objects.create(user=cls.student, title="Poster", category="Branding")
+
+    def setUp(self):
+        self.state = RequestState()
+        token = request_state.set(self.state)
+        self.addCleanup(request_state.reset, token)
+
+    def choose(self, taken_ago, method="get", written_ago=None, max_age=60):
+        request = getattr(RequestFactory(), method)("/projects/all/")
+        if written_ago is not None:
+            request.COOKIES[WRITTEN_AT_COOKIE] = str(1000 - written_ago)
+        with mock.patch("myapp.snapshot.snapshot_taken_at", return_value=1000 - taken_ago), \
+                mock.patch("myapp.snapshot.time.time", return_value=1000):
+            _choose_snapshot(request, max_age)
+        return self.state.read_alias
+
+    def writes(self, action):
+        with CaptureQueriesContext(connection) as queries:
+            action()
+        return [q["sql"] for q in queries if q["sql"].lstrip()[:6].upper() in ("INSERT", "UPDATE", "DELETE")]
+
+    def test_fresh_snapshot_is_used_for_gets_only(self):
+        self.assertEqual(self.choose(taken_ago=10), SNAPSHOT_ALIAS)
+        self.state.read_alias = None
+        self.assertIsNone(self.choose(taken_ago=10, method="post"))
+        self.assertIsNone(self.choose(taken_ago=90))
+
+    def test_browser_stays_on_primary_until_snapshot_includes_its_write(self):
+        self.assertIsNone(self.choose(taken_ago=10, written_ago=5))
+        self.assertEqual(self.choose(taken_ago=10, written_ago=20), SNAPSHOT_ALIAS)
+
+    def test_router_sends_app_reads_to_snapshot_until_first_write(self):
+        router = SnapshotRouter()
+        self.state.read_alias = SNAPSHOT_ALIAS
+        self.assertEqual(router.db_for_read(Project), SNAPSHOT_ALIAS)
+        self.assertIsNone(router.db_for_read(Session))
+        self.assertEqual(router.db_for_write(Project), "default")
+
+        with connection.execute_wrapper(watch_writes):
+            Project.objects.filter(pk=self.project.pk).update(views=1)
+        self.assertTrue(self.state.wrote)
+        self.assertIsNone(router.db_for_read(Project))
+
+    def test_counters_and_engagement_are_not_seen_writes(self):
+        from .views import _count_view
+
+        with mock.patch("myapp.views.write_throttle.allow", return_value=True):
+            counted = self.writes(lambda: _count_view(self.project, self.student))
+        logged = self.writes(lambda: EngagementEvent.objects.create(
+            project=self.project, event=EngagementEvent.VIEW, created_at=self.project.created_at,
+        ))
+        login = self.writes(lambda: User.objects.filter(pk=self.student.pk).update(last_login=self.project.created_at))
+        self.assertEqual(len(counted), 2)
+        for sql in counted + logged + login:
+            self.assertFalse(is_seen_write(sql), sql)
+
+    def test_content_writes_are_seen(self):
+        fan = User.objects.create(username="fan")
+        liked = self.writes(lambda: Like.objects.create(user=fan, project=self.project))
+        renamed = self.writes(lambda: Project.objects.filter(pk=self.project.pk).update(title="Logo", views=3))
+        self.assertTrue(any(is_seen_write(sql) for sql in liked))
+        self.assertTrue(is_seen_write(renamed[0]))
+
+    def test_middleware_sets_cookie_only_for_seen_writes(self):
+        def view(action):
+            def get_response(request):
+                action()
+                return HttpResponse()
+            return SnapshotMiddleware(get_response)(RequestFactory().get("/"))
+
+        counted = view(lambda: Project.objects.filter(pk=self.project.pk).update(views=5))
+        renamed = view(lambda: Project.objects.filter(pk=self.project.pk).update(title="Logo"))
+        self.assertNotIn(WRITTEN_AT_COOKIE, counted.cookies)
+        self.assertIn(WRITTEN_AT_COOKIE, renamed.cookies)
@@ -0,0 +1,59 @@
+"""
+In-memory write throttling for view counts and like toggles.
+
+Each (action, user, project) key gets a token bucket. A view is counted only if
+the user has not viewed that project within WRITE_THROTTLE_VIEW_WINDOW seconds,
+so refresh loops stop turning into UPDATEs. Like toggles get a small burst
+allowance; double-clicks and scripted toggling beyond it are answered from the
+current state without writing. State is per worker process and bounded to
+WRITE_THROTTLE_MAX_KEYS entries (least recently used keys are dropped).
+"""
+
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from django.conf import settings
+
+
+class WriteThrottle:
+    def __init__(self, policies, max_keys):
+        self.policies = policies  # action -> (capacity, seconds per token)
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()  # key -> (tokens, last refill time)
+        self._lock = threading.Lock()
+        self.allowed = Counter()
+        self.suppressed = Counter()
+
+    def allow(self, action, user_id, project_id):
+        capacity, refill_seconds = self.policies[action]
+        key = (action, user_id, project_id)
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) / refill_seconds)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            (self.allowed if allowed else self.suppressed)[action] += 1
+        return allowed
+
+    def stats(self):
+        with self._lock:
+            return {
+                "tracked_keys": len(self._buckets),
+                "allowed": dict(self.allowed),
+                "suppressed": dict(self.suppressed),
+            }
+
+
+write_throttle = WriteThrottle(
+    policies={
+        "view": (1, settings.WRITE_THROTTLE_VIEW_WINDOW),
+        "like": (settings.WRITE_THROTTLE_LIKE_BURST, settings.WRITE_THROTTLE_LIKE_REFILL_SECONDS),
+    },
+    max_keys=settings.WRITE_THROTTLE_MAX_KEYS,
+)
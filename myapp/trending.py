@@ -0,0 +1,45 @@
+"""
+Time-decayed trending scores for projects and students.
+
+Every engagement adds ``weight * 2 ** (age / HALF_LIFE)`` to the project's and
+its owner's ``trending_score``, where ``age`` is measured from a fixed epoch.
+Instead of decaying every stored score over time, new events are simply worth
+more than old ones, which gives the same ordering as a true exponential decay.
+Updates are single ``UPDATE ... SET trending_score = trending_score + x``
+statements, and the gallery ranks with ``ORDER BY trending_score DESC LIMIT n``
+on an indexed column.
+
+Scores grow by 2x per half-life, so a float overflows after roughly 7,000 days
+(about 19 years). Move TRENDING_EPOCH forward and run ``manage.py rebuild_trending``
+well before that.
+"""
+
+from datetime import datetime, timezone as dt_timezone
+
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Profile, Project
+
+TRENDING_EPOCH = datetime(2025, 1, 1, tzinfo=dt_timezone.utc)
+HALF_LIFE_DAYS = 7
+
+EVENT_WEIGHTS = {
+    "view": 1.0,
+    "like": 5.0,
+    "unlike": -5.0,
+    "hire": 20.0,
+}
+
+
+def event_score(event, when=None):
+    when = when or timezone.now()
+    age_days = (when - TRENDING_EPOCH).total_seconds() / 86400
+    return EVENT_WEIGHTS[event] * 2 ** (age_days / HALF_LIFE_DAYS)
+
+
+def record_event(project, event, when=None, count=1):
+    """Add ``count`` events to the project's and its owner's trending scores."""
+    increment = event_score(event, when) * count
+    Project.objects.filter(pk=project.pk).update(trending_score=F("trending_score") + increment)
+    Profile.objects.filter(user_id=project.user_id).update(trending_score=F("trending_score") + increment)
@@ -1,23 +1,43 @@
+from django.conf import settings
 from django.urls import path
 from .import views
 
+# ASGI deployments swap in the async variants (settings.ASYNC_VIEWS)
+if settings.ASYNC_VIEWS:
+    dashboard_view = views.DashboardAsync
+    project_detail_view = views.project_detail_async
+    all_messages_view = views.AllMessagesViewAsync
+else:
+    dashboard_view = views.Dashboard
+    project_detail_view = views.project_detail
+    all_messages_view = views.AllMessagesView
+
 
 urlpatterns = [
     path("", views.login_page, name="login"),
     path("admin_login", views.admin_login, name="admin_login"),
     path("student_login", views.student_login, name="student_login"),
-    path("dashboard", views.Dashboard, name="dashboard"),
+    path("dashboard", dashboard_view, name="dashboard"),
     path("logout", views.user_logout, name="logout"),
     path("create_student", views.create_student, name="create_student"),
+    path("create_student/import", views.import_students_view, name="import_students"),
 
     path("edit-profile", views.edit_profile, name="edit_profile"),
     path('student/<int:student_id>/projects/', views.view_student_projects, name='view_student_projects'),
 
      path('projects/all/', views.my_projects, name='my_projects'),
-     path('project/<int:pk>/', views.project_detail, name='project_detail'),
+     path('project/<int:pk>/', project_detail_view, name='project_detail'),
+     path('project/<int:pk>/download/', views.download_project, name='download_project'),
 
      path('project/<int:project_id>/hire/', views.HireNowView, name='hire_now'),
-     path('messages/', views.AllMessagesView, name='all_messages'),
+     path('messages/', all_messages_view, name='all_messages'),
+     path('messages/inbox/', views.inbox, name='inbox'),
+     path('messages/thread/<int:pk>/', views.thread_detail, name='thread_detail'),
+     path('export/<str:kind>/', views.export_data, name='export_data'),
+     path('notifications/stream/', views.notification_stream, name='notification_stream'),
+     path('throttle/stats/', views.throttle_stats, name='throttle_stats'),
+     path('students/autocomplete/', views.student_autocomplete, name='student_autocomplete'),
+     path('healthz', views.healthz, name='healthz'),
 
 
 
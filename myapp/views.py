@@ -3,7 +3,14 @@ from django.contrib.auth.decorators import login_required
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.models import User
 from django.contrib import messages
-from .models import Profile, Project, ProjectImage, Message, HiringInquiry
+from .models import Profile, Project, ProjectImage, Message, HiringInquiry, EngagementEvent, ProjectDailyStats, Thread
+from .onboarding import import_students, read_rows
+from .trending import event_score
+from .engagement import log_event
+from .notifications import broker, format_event, publish_unread_count
+from .throttle import write_throttle
+from .search import in_result_order, student_index
+from .snapshot import use_snapshot
 
 # ---------------- LOGIN VIEWS ----------------
 
@@ -42,9 +49,12 @@ def user_logout(request):
 # ---------------- DASHBOARD ----------------
 
 
-from django.db.models import Q
+from django.db.models import F, Q, Sum
+
+SEARCH_RESULTS_LIMIT = 50  # students shown for a dashboard name search
 
 @login_required
+@use_snapshot(max_age=60)
 def Dashboard(request):
     if request.user.is_superuser:
         # -----------------------------
@@ -53,34 +63,40 @@ def Dashboard(request):
 
         # Get search query (optional)
         search_name = request.GET.get('student_name', '').strip()
+        order = request.GET.get('order', 'recent')  # 'recent' or 'trending'
+
+        if order == "trending":
+            # Top 3 students straight from the indexed trending_score column
+            students = (
+                Profile.objects
+                .filter(user__is_superuser=False)
+                .select_related('user')
+                .order_by('-trending_score')[:3]
+            )
+        else:
+            # Step 1: Find the 3 most recently active students (those who uploaded projects)
+            recent_projects = (
+                Project.objects
+                .select_related('user')
+                .filter(user__is_superuser=False)
+                .order_by('-created_at')[:3]
+            )
 
-        # Step 1: Find the 3 most recently active students (those who uploaded projects)
-        recent_projects = (
-            Project.objects
-            .select_related('user')
-            .filter(user__is_superuser=False)
-            .order_by('-created_at')[:3]
-        )
-
-        # Collect unique users from those projects (in order)
-        recent_users = []
-        seen_user_ids = set()
-        for proj in recent_projects:
-            if proj.user.id not in seen_user_ids:
-                seen_user_ids.add(proj.user.id)
-                recent_users.append(proj.user)
+            # Collect unique users from those projects (in order)
+            recent_users = []
+            seen_user_ids = set()
+            for proj in recent_projects:
+                if proj.user.id not in seen_user_ids:
+                    seen_user_ids.add(proj.user.id)
+                    recent_users.append(proj.user)
 
-        # Step 2: Get Profile objects of those users
-        students = Profile.objects.filter(user__in=recent_users).select_related('user')
+            # Step 2: Get Profile objects of those users
+            students = Profile.objects.filter(user__in=recent_users).select_related('user')
 
         # Step 3: Optional search filter (if admin searches, show all matching)
         if search_name:
-            students = Profile.objects.filter(
-                Q(first_name__icontains=search_name)
-                | Q(last_name__icontains=search_name)
-                | Q(user__username__icontains=search_name),
-                user__is_superuser=False
-            ).select_related('user')
+            matches = student_index.search(search_name, limit=SEARCH_RESULTS_LIMIT)
+            students = in_result_order(Profile.objects.select_related('user'), matches)
 
         # Step 4: Fetch last 3 projects per student
         student_projects = {}
@@ -111,6 +127,7 @@ def Dashboard(request):
             "total_students": total_students,
             "total_notifications": total_notifications,
             "search_name": search_name,
+            "order": order,
         }
         return render(request, "myapp/dashboard.html", context)
 
@@ -190,7 +207,10 @@ def edit_profile(request):
         profile_image = request.FILES.get("profile_image")
         if profile_image:
             profile.profile_image = profile_image
-        profile.save()
+        # Only the edited columns: the maintained totals (profile_stats, trending) may have moved since the load.
+        profile.save(update_fields=[
+            "first_name", "last_name", "course", "mobile", "location", "address", "profile_image",
+        ])
         messages.success(request, "Profile updated successfully!")
         return redirect("dashboard")
 
@@ -199,6 +219,8 @@ def edit_profile(request):
 
 # ---------------- STUDENT CREATION (ADMIN ONLY) ----------------
 
+from django.conf import settings
+
 @login_required
 def create_student(request):
     if not request.user.is_superuser:
@@ -214,7 +236,45 @@ def create_student(request):
             messages.success(request, f"Student {username} created successfully!")
             return redirect("dashboard")
 
-    return render(request, "myapp/user_create.html")
+    return render(request, "myapp/user_create.html", {"import_max_rows": settings.IMPORT_STUDENTS_WEB_MAX_ROWS})
+
+
+@login_required
+def import_students_view(request):
+    """Bulk-create students from an uploaded CSV/JSON file (see myapp.onboarding)."""
+    if not request.user.is_superuser:
+        return redirect("dashboard")
+
+    upload = request.FILES.get("file") if request.method == "POST" else None
+    if not upload:
+        if request.method == "POST":
+            messages.error(request, "Choose a CSV or JSON file to import.")
+        return redirect("create_student")
+
+    fmt = "json" if upload.name.lower().endswith(".json") else "csv"
+    try:
+        rows = read_rows(upload.read(), fmt)
+    except ValueError as exc:
+        messages.error(request, f"Could not read {upload.name}: {exc}")
+        return redirect("create_student")
+
+    # Each password hash costs about half a second, so the web upload is capped to stay
+    # inside the server timeout; larger cohorts go through `manage.py import_students`.
+    if len(rows) > settings.IMPORT_STUDENTS_WEB_MAX_ROWS:
+        messages.error(
+            request,
+            f"{upload.name} has {len(rows)} rows; the upload form takes at most "
+            f"{settings.IMPORT_STUDENTS_WEB_MAX_ROWS}. Use `manage.py import_students` for larger files.",
+        )
+        return redirect("create_student")
+
+    # Hash in this worker: no process pool inside a threaded web server.
+    result = import_students(rows, workers=1)
+    messages.success(request, f"Created {len(result.created)} of {len(rows)} students.")
+    return render(request, "myapp/user_create.html", {
+        "import_errors": result.errors,
+        "import_max_rows": settings.IMPORT_STUDENTS_WEB_MAX_ROWS,
+    })
 
 
 # ---------------- VIEW STUDENT PROJECTS ----------------
@@ -238,14 +298,24 @@ def create_student(request):
 #         }
 #     )
 @login_required
+@use_snapshot(max_age=120)
 def view_student_projects(request, student_id):
     student = get_object_or_404(Profile, id=student_id)
     projects = Project.objects.filter(user=student.user).prefetch_related('images')
 
-    # Total appreciation count (likes)
-    total_likes = sum(p.likes.count() for p in projects)
-    # Total project views
-    total_views = sum(p.views for p in projects)
+    # Totals are maintained on the profile (myapp/profile_stats.py), no aggregation here
+
+    # This week vs last week, from the daily rollups (one query on the user/day index)
+    today = timezone.now().date()
+    week_start = today - timedelta(days=6)
+    trend = ProjectDailyStats.objects.filter(
+        user=student.user, day__gte=week_start - timedelta(days=7)
+    ).aggregate(
+        views_this_week=Sum('views', filter=Q(day__gte=week_start), default=0),
+        views_last_week=Sum('views', filter=Q(day__lt=week_start), default=0),
+        likes_this_week=Sum('likes', filter=Q(day__gte=week_start), default=0),
+        inquiries_this_week=Sum('inquiries', filter=Q(day__gte=week_start), default=0),
+    )
 
     return render(
         request,
@@ -254,8 +324,9 @@ def view_student_projects(request, student_id):
             "student": student,
             "projects": projects,
             "profile": student,
-            "total_likes": total_likes,
-            "total_views": total_views,
+            "total_likes": student.total_likes,
+            "total_views": student.total_views,
+            "trend": trend,
         }
     )
 
@@ -269,6 +340,7 @@ from django.shortcuts import render
 from .models import Profile, Project
 
 @login_required
+@use_snapshot(max_age=120)
 def my_projects(request):
     if request.user.is_superuser:
         # Admin: see all students and their projects
@@ -278,9 +350,16 @@ def my_projects(request):
         # 🔍 Get filter params
         search_name = request.GET.get('name', '').strip()
         search_project = request.GET.get('project', '').strip()
-        sort_order = request.GET.get('sort', 'desc')  # 'asc' or 'desc'
+        sort_order = request.GET.get('sort', 'desc')  # 'asc', 'desc' or 'trending'
         recent_days = request.GET.get('recent_days', '').strip()
 
+        if sort_order == "trending":
+            students = students.order_by('-trending_score')
+
+        # Filter by student name (prefix match on first/last name or username)
+        if search_name:
+            students = students.filter(id__in=[m["id"] for m in student_index.search(search_name, limit=None)])
+
         for student in students:
             projects = Project.objects.filter(user=student.user)
 
@@ -288,11 +367,6 @@ def my_projects(request):
             if search_project:
                 projects = projects.filter(title__icontains=search_project)
 
-            # Filter by student name
-            if search_name:
-                if f"{student.first_name} {student.last_name}".lower().find(search_name.lower()) == -1:
-                    continue  # Skip this student if not matching
-
             # Filter by recent days
             if recent_days.isdigit():
                 days = int(recent_days)
@@ -302,6 +376,8 @@ def my_projects(request):
             # Sort
             if sort_order == "asc":
                 projects = projects.order_by('created_at')
+            elif sort_order == "trending":
+                projects = projects.order_by('-trending_score')
             else:
                 projects = projects.order_by('-created_at')
 
@@ -322,21 +398,26 @@ def my_projects(request):
         # Student view (no change)
         student, _ = Profile.objects.get_or_create(user=request.user)
         projects_dict = {}
+        sort_order = request.GET.get('sort', 'desc')
+        project_order = '-trending_score' if sort_order == "trending" else '-id'
 
-        own_projects = Project.objects.filter(user=request.user).prefetch_related('images').order_by('-id')
+        own_projects = Project.objects.filter(user=request.user).prefetch_related('images').order_by(project_order)
         if own_projects.exists():
             projects_dict[student] = own_projects
 
         other_profiles = Profile.objects.filter(user__is_superuser=False).exclude(user=request.user).select_related('user')
+        if sort_order == "trending":
+            other_profiles = other_profiles.order_by('-trending_score')
         for other in other_profiles:
-            public_projects = Project.objects.filter(user=other.user, visibility="Public").prefetch_related('images').order_by('-id')
+            public_projects = Project.objects.filter(user=other.user, visibility="Public").prefetch_related('images').order_by(project_order)
             if public_projects.exists():
                 projects_dict[other] = public_projects
 
-        return render(request, "myapp/projects.html", {"student_projects": projects_dict})
+        return render(request, "myapp/projects.html", {"student_projects": projects_dict, "sort_order": sort_order})
 
 # ---------------- PROJECT DETAIL ----------------
 
+from django.db import transaction
 from django.http import JsonResponse
 from .models import Like
 
@@ -365,17 +446,40 @@ from .models import Like
 #             "like_count": project.likes.count(),
 #         }
 #     )
+def _count_view(project, user):
+    """Count a view unless this user already viewed the project within the throttle window."""
+    if not write_throttle.allow("view", user.id, project.id):
+        return
+    # Counter and trending score move together: one UPDATE per table, one commit.
+    score = event_score("view")
+    with transaction.atomic():
+        Project.objects.filter(pk=project.pk).update(
+            views=F('views') + 1, trending_score=F('trending_score') + score,
+        )
+        Profile.objects.filter(user_id=project.user_id).update(
+            total_views=F('total_views') + 1, trending_score=F('trending_score') + score,
+        )
+    project.views += 1
+    log_event(project.id, user.id, EngagementEvent.VIEW)
+
+
 @login_required
 def project_detail(request, pk):
     project = get_object_or_404(Project.objects.prefetch_related('images'), pk=pk)
     student = project.user.profile
 
     # Increment view count
-    project.views = project.views + 1
-    project.save(update_fields=['views'])
+    _count_view(project, request.user)
 
     # Handle like toggle (if any)
     if request.method == "POST" and request.POST.get("action") == "like":
+        if not write_throttle.allow("like", request.user.id, project.id):
+            # Too many toggles in a row: answer with the current state, no write
+            return JsonResponse({
+                "liked": project.likes.filter(user=request.user).exists(),
+                "like_count": project.likes.count(),
+                "throttled": True,
+            })
         like, created = Like.objects.get_or_create(project=project, user=request.user)
         if not created:
             like.delete()
@@ -396,6 +500,20 @@ def project_detail(request, pk):
     )
 
 
+# ---------------- DOWNLOAD PROJECT IMAGES ----------------
+
+from django.http import Http404
+from .downloads import project_zip_response
+
+@login_required
+def download_project(request, pk):
+    project = get_object_or_404(Project, pk=pk)
+    is_owner = request.user == project.user or request.user.is_superuser
+    if not project.allow_downloads or (project.visibility == "Private" and not is_owner):
+        raise Http404("Downloads are not enabled for this project")
+    return project_zip_response(request, project)
+
+
 # ---------------- HIRE NOW ----------------
 @login_required
 def HireNowView(request, project_id):
@@ -430,13 +548,9 @@ def HireNowView(request, project_id):
             content=f"{request.user.username} sent a hiring inquiry for your project '{project.title}'."
         )
 
-        # ✅ Appreciation count increment
-        try:
-            profile = Profile.objects.get(user=student)
-            profile.appreciation_count = profile.appreciation_count + 1
-            profile.save()
-        except Profile.DoesNotExist:
-            pass  # If no profile, ignore safely
+        # ✅ Appreciation count increment (in SQL, so no other profile column is written back;
+        # a student without a profile is simply skipped)
+        Profile.objects.filter(user=student).update(appreciation_count=F('appreciation_count') + 1)
 
         messages.success(request, f"Inquiry sent to {student.username} and appreciation added!")
         return redirect("dashboard")
@@ -462,7 +576,270 @@ def AllMessagesView(request):
         ).order_by('-created_at')
 
     # Mark unread messages as read
-    all_messages.filter(read=False).update(read=True)
+    Thread.mark_read(request.user, all_messages)
+    publish_unread_count(request.user.id)
 
     # 👇 Use "all_messages" instead of "messages" in render context
-    return render(request, "myapp/all_messages.html", {"all_messages": all_messages})
+    # (each row shows the sender's avatar, so fetch sender and profile in the same query)
+    return render(request, "myapp/all_messages.html", {
+        "all_messages": all_messages.select_related('sender__profile'),
+    })
+
+
+INBOX_LIMIT = 100  # most recent conversations listed
+
+
+@login_required
+def inbox(request):
+    """Conversations, newest first, straight from the denormalized Thread rows."""
+    threads = list(
+        Thread.objects.for_user(request.user)
+        .select_related('project', 'user_low__profile', 'user_high__profile')
+        .order_by('-last_message_at')[:INBOX_LIMIT]
+    )
+    for thread in threads:
+        thread.other = thread.other_participant(request.user)
+        thread.unread = thread.unread_for(request.user)
+    return render(request, "myapp/inbox.html", {"threads": threads})
+
+
+@login_required
+def thread_detail(request, pk):
+    thread = get_object_or_404(
+        Thread.objects.for_user(request.user).select_related('project', 'user_low__profile', 'user_high__profile'),
+        pk=pk,
+    )
+    thread_messages = list(thread.messages.select_related('sender__profile').order_by('created_at'))
+    if thread.unread_for(request.user):
+        Thread.mark_read(request.user, thread.messages.all())
+        publish_unread_count(request.user.id)
+    return render(request, "myapp/thread.html", {
+        "thread": thread,
+        "other": thread.other_participant(request.user),
+        "thread_messages": thread_messages,
+    })
+
+
+# ---------------- EXPORTS (ADMIN ONLY) ----------------
+
+from django.http import StreamingHttpResponse
+from .exports import EXPORTS, stream_export
+from .streaming import streaming_body
+
+@login_required
+def export_data(request, kind):
+    """Stream projects, inquiries or messages as CSV/JSON using the my_projects filters."""
+    if not request.user.is_superuser:
+        return redirect("dashboard")
+    if kind not in EXPORTS:
+        raise Http404("Unknown export")
+
+    fmt = "json" if request.GET.get("format") == "json" else "csv"
+    response = StreamingHttpResponse(
+        streaming_body(request, stream_export(kind, fmt, request.GET)),
+        content_type="application/json" if fmt == "json" else "text/csv",
+    )
+    filename = f"{kind}-{timezone.now():%Y%m%d}.{fmt}"
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+# ---------------- ASYNC VARIANTS (ASGI) ----------------
+# Used instead of the sync views above when settings.ASYNC_VIEWS is on (see
+# myproject/asgi.py). Independent queries are awaited together with
+# asyncio.gather; template rendering stays sync because templates can still
+# trigger lazy queries (images.first).
+
+import asyncio
+from asgiref.sync import sync_to_async
+
+
+async def _alist(queryset):
+    return [obj async for obj in queryset]
+
+
+async def _arender(request, template, context):
+    return await sync_to_async(render)(request, template, context)
+
+
+@login_required
+@use_snapshot(max_age=60)
+async def DashboardAsync(request):
+    user = await request.auser()
+    if not user.is_superuser or request.method != "GET":
+        # Student dashboard handles uploads; keep the sync implementation for it.
+        return await sync_to_async(Dashboard)(request)
+
+    search_name = request.GET.get('student_name', '').strip()
+    order = request.GET.get('order', 'recent')
+
+    if search_name:
+        matches = await sync_to_async(student_index.search)(search_name, limit=SEARCH_RESULTS_LIMIT)
+        students_qs = in_result_order(Profile.objects.select_related('user'), matches)
+    elif order == "trending":
+        students_qs = (
+            Profile.objects.filter(user__is_superuser=False)
+            .select_related('user').order_by('-trending_score')[:3]
+        )
+    else:
+        recent_user_ids = await _alist(
+            Project.objects.filter(user__is_superuser=False)
+            .order_by('-created_at').values_list('user_id', flat=True)[:3]
+        )
+        students_qs = Profile.objects.filter(user_id__in=recent_user_ids).select_related('user')
+
+    my_messages = Message.objects.filter(recipient=user)
+    (
+        students, recent_messages, unread_count,
+        total_projects, total_students, total_notifications,
+    ) = await asyncio.gather(
+        _alist(students_qs),
+        _alist(my_messages.select_related('sender__profile').order_by('-created_at')[:3]),
+        my_messages.filter(read=False).acount(),
+        Project.objects.acount(),
+        User.objects.filter(is_superuser=False).acount(),
+        my_messages.acount(),
+    )
+
+    # Last 3 projects per student, fetched concurrently
+    project_lists = await asyncio.gather(*(
+        _alist(Project.objects.filter(user_id=student.user_id).prefetch_related('images').order_by('-id')[:3])
+        for student in students
+    ))
+    student_projects = dict(zip(students, project_lists))
+
+    return await _arender(request, "myapp/dashboard.html", {
+        "is_admin": True,
+        "students": students,
+        "student_projects": student_projects,
+        "recent_messages": recent_messages,
+        "unread_count": unread_count,
+        "total_projects": total_projects,
+        "total_students": total_students,
+        "total_notifications": total_notifications,
+        "search_name": search_name,
+        "order": order,
+    })
+
+
+@login_required
+async def AllMessagesViewAsync(request):
+    user = await request.auser()
+    all_messages = Message.objects.filter(recipient=user)
+    if user.is_superuser:
+        all_messages = all_messages.exclude(sender__is_superuser=True)
+
+    # Nothing on the page depends on "read", so fetch and mark read together.
+    message_list, _ = await asyncio.gather(
+        _alist(all_messages.select_related('sender__profile').order_by('-created_at')),
+        sync_to_async(Thread.mark_read)(user, all_messages),
+    )
+    await sync_to_async(publish_unread_count)(user.id)
+    return await _arender(request, "myapp/all_messages.html", {"all_messages": message_list})
+
+
+@login_required
+async def project_detail_async(request, pk):
+    if request.method != "GET":
+        # Like toggles go through the sync view.
+        return await sync_to_async(project_detail)(request, pk)
+
+    user = await request.auser()
+    try:
+        project = await Project.objects.select_related('user__profile').prefetch_related('images').aget(pk=pk)
+    except Project.DoesNotExist:
+        raise Http404("No Project matches the given query.")
+
+    _, like_count, is_liked = await asyncio.gather(
+        sync_to_async(_count_view)(project, user),
+        project.likes.acount(),
+        project.likes.filter(user=user).aexists(),
+    )
+
+    return await _arender(request, "myapp/project_detail.html", {
+        "project": project,
+        "student": project.user.profile,
+        "is_liked": is_liked,
+        "like_count": like_count,
+    })
+
+
+
+# ---------------- NOTIFICATION STREAM (SSE) ----------------
+
+from django.http import HttpResponse
+
+@login_required
+async def notification_stream(request):
+    """Server-sent events: "unread" counts and "message" events for the current user."""
+    if not settings.ASYNC_VIEWS:
+        # Under WSGI every open stream would pin a worker thread; 204 tells
+        # EventSource to stop reconnecting and the page keeps working without it.
+        return HttpResponse(status=204)
+
+    user = await request.auser()
+    heartbeat = settings.SSE_HEARTBEAT_SECONDS
+
+    async def events():
+        subscription = broker.subscribe(user.id)
+        try:
+            count = await Message.objects.filter(recipient=user, read=False).acount()
+            yield format_event("unread", {"count": count})
+            _, queue = subscription
+            while True:
+                try:
+                    event, data = await asyncio.wait_for(queue.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield format_event(event, data)
+        finally:
+            broker.unsubscribe(user.id, subscription)
+
+    response = StreamingHttpResponse(events(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+
+# ---------------- WRITE THROTTLE STATS (ADMIN ONLY) ----------------
+
+@login_required
+def throttle_stats(request):
+    """Counters of view/like writes allowed and suppressed by this worker."""
+    if not request.user.is_superuser:
+        return redirect("dashboard")
+    return JsonResponse(write_throttle.stats())
+
+
+# ---------------- STUDENT NAME TYPEAHEAD (ADMIN ONLY) ----------------
+
+from django.urls import reverse
+
+@login_required
+def student_autocomplete(request):
+    """Students whose name or username starts with ?q=, answered from the in-memory index."""
+    if not request.user.is_superuser:
+        return redirect("dashboard")
+    results = [
+        {**match, "url": reverse("view_student_projects", args=[match["id"]])}
+        for match in student_index.search(request.GET.get("q", ""), limit=10)
+    ]
+    return JsonResponse({"results": results})
+
+
+# ---------------- HEALTH CHECK ----------------
+
+from django.db import DatabaseError, connection
+
+def healthz(request):
+    """Readiness probe: one trivial query, no session, no auth lookup."""
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+    except DatabaseError:
+        return JsonResponse({"status": "unavailable"}, status=503)
+    response = JsonResponse({"status": "ok"})
+    response["Cache-Control"] = "no-store"
+    return response
@@ -0,0 +1,73 @@
+"""
+Server start-up work (see gunicorn.conf.py and myproject/asgi.py).
+
+``enable_wal`` switches the primary database to WAL journaling once per server
+start. ``warm_up`` runs in each worker right after it starts (gunicorn's
+post_fork hook). Django itself is already imported when the app is preloaded,
+but each worker still pays on its first real request for populating the URL
+resolver, compiling templates, loading the static manifest and building the
+student index. Doing that here keeps those costs off the first user requests
+after a deploy or a worker recycle. Database connections are per thread, so
+the request threads open their own (and keep them, see CONN_MAX_AGE); the one
+used here is closed again.
+"""
+
+import logging
+import sqlite3
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.http import HttpRequest
+from django.template.loader import get_template
+from django.urls import get_resolver, reverse
+
+logger = logging.getLogger("myapp.warmup")
+
+# Pages most requests land on; compiled and rendered once with an empty context.
+WARM_TEMPLATES = [
+    "myapp/login.html",
+    "myapp/dashboard.html",
+    "myapp/projects.html",
+    "myapp/project_detail.html",
+    "myapp/view_student_projects.html",
+    "myapp/all_messages.html",
+    "myapp/inbox.html",
+]
+
+
+def enable_wal():
+    """Put the primary database in WAL mode, so readers proceed while a worker writes."""
+    # Journal mode is stored in the database file; management commands leave it alone.
+    database = sqlite3.connect(settings.DATABASES[DEFAULT_DB_ALIAS]["NAME"], timeout=20)
+    try:
+        database.execute("PRAGMA journal_mode=WAL")
+    finally:
+        database.close()
+
+
+def warm_up():
+    started = time.perf_counter()
+
+    get_resolver().url_patterns
+    reverse("dashboard")  # builds the reverse lookup tables
+
+    request = HttpRequest()
+    request.method = "GET"
+    request.META.update(SERVER_NAME="localhost", SERVER_PORT="80")
+    request.user = AnonymousUser()
+    for name in WARM_TEMPLATES:
+        template = get_template(name)
+        try:
+            template.render({}, request)
+        except Exception:
+            # Compiling is the expensive part and already happened; some pages
+            # cannot render without their real context.
+            logger.debug("warm-up render of %s failed", name, exc_info=True)
+
+    from .search import student_index
+    student_index.ensure_built()
+    connections.close_all()  # this thread does not serve requests
+
+    logger.info("worker warmed up in %.0f ms", (time.perf_counter() - started) * 1000)
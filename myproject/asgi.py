@@ -3,6 +3,15 @@ ASGI config for myproject project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serving through ASGI runs the regular views by default, e.g.:
+
+    uvicorn myproject.asgi:application --workers 4
+
+DJANGO_ASYNC_VIEWS=1 additionally switches on the notification stream and the
+async dashboard, project detail and messages views. Those measured slower than
+the sync views in `manage.py bench --asgi`, so they are opt-in; rerun the bench
+before enabling them.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -14,3 +23,7 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'myproject.settings')
 
 application = get_asgi_application()
+
+from myapp.warmup import enable_wal  # imports models, so only once the app registry is ready
+
+enable_wal()
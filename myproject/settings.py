@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -47,19 +48,66 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'myapp.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.middleware.http.ConditionalGetMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'myapp.middleware.SnapshotMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'myapp.middleware.ProfilerMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
 ROOT_URLCONF = 'myproject.urls'
 
+# Per-request SQL/template timing (Server-Timing header + "myapp.requests" log lines).
+# Off by default; the middleware removes itself when disabled.
+REQUEST_METRICS_ENABLED = False
+REQUEST_METRICS_SLOW_MS = 500  # requests slower than this log their SQL
+REQUEST_METRICS_DUPLICATE_THRESHOLD = 3  # same SQL this many times in one request = likely N+1
+
+# Superusers can add ?profile=1 (or "X-Profile: 1") to run a request under cProfile.
+# Stats files land here and are listed under "Request profiles" in the admin.
+PROFILES_DIR = BASE_DIR / 'profiles'
+
+# Bulk student import: the admin upload form hashes passwords inside the request
+# (about 0.5 s each with Django's PBKDF2 cost on one core), so it accepts at most
+# this many rows to stay well under the gunicorn timeout; larger cohorts go
+# through `manage.py import_students`, which hashes on every CPU.
+IMPORT_STUDENTS_WEB_MAX_ROWS = 20
+
+# Engagement log (myapp/engagement.py): events are written in batches of this size,
+# or by a timer once the oldest buffered event is this many seconds old.
+ENGAGEMENT_BUFFER_SIZE = 200
+ENGAGEMENT_FLUSH_SECONDS = 5
+
+# Write throttling (myapp/throttle.py): a user's repeat views of a project within
+# the window are not counted, and like toggles beyond the burst are answered
+# without writing until a token refills.
+WRITE_THROTTLE_VIEW_WINDOW = 30 * 60  # seconds
+WRITE_THROTTLE_LIKE_BURST = 3
+WRITE_THROTTLE_LIKE_REFILL_SECONDS = 2
+WRITE_THROTTLE_MAX_KEYS = 100000
+
+# Student name typeahead (myapp/search.py): each worker keeps its own index and
+# reloads it after this many seconds to pick up edits made in other workers.
+STUDENT_INDEX_MAX_AGE = 5 * 60  # seconds
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'myapp': {'handlers': ['console'], 'level': 'INFO'},
+    },
+}
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -70,6 +118,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'myapp.context_processors.deployment',
             ],
         },
     },
@@ -77,16 +126,62 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'myproject.wsgi.application'
 
+# Opt-in for ASGI deployments (DJANGO_ASYNC_VIEWS=1): enables the notification
+# stream and routes the dashboard, project detail and messages URLs to their async
+# views. Off by default, including under ASGI: the async views benched slower.
+ASYNC_VIEWS = os.environ.get('DJANGO_ASYNC_VIEWS') == '1'
+SSE_HEARTBEAT_SECONDS = 25  # keep-alive comment on idle notification streams
+
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+SNAPSHOT_PATH = BASE_DIR / 'db.snapshot.sqlite3'
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
-    }
+        # Each gunicorn thread keeps its connection (and the pragmas below) across requests
+        # instead of reconnecting every time; the health check replaces a connection that
+        # went bad. ASGI runs sync code on short-lived threads, so it reconnects per request.
+        'CONN_MAX_AGE': 0 if ASYNC_VIEWS else 60,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            # Run on every new connection. NORMAL sync is safe under WAL, which the server
+            # switches the file to at start-up (myapp.warmup.enable_wal: it is a property of
+            # the file, so setting it here would convert the database for every manage.py
+            # command too); the larger page cache and mmap cut read syscalls.
+            'init_command': (
+                'PRAGMA synchronous=NORMAL;'
+                'PRAGMA cache_size=-20000;'
+                'PRAGMA mmap_size=134217728;'
+                'PRAGMA temp_store=MEMORY;'
+            ),
+            # Take the write lock when a transaction starts instead of failing mid-way,
+            # and wait for it rather than raising "database is locked" at once.
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,
+        },
+    },
+    # Read-only copy of the primary for listing pages (myapp/snapshot.py). Never migrated;
+    # tests read the primary instead. No persistent connections: each refresh swaps in a
+    # new file, which a long-lived connection would never see.
+    'snapshot': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': f"{SNAPSHOT_PATH.as_uri()}?mode=ro",
+        'OPTIONS': {'timeout': 20},
+        'TEST': {'MIRROR': 'default'},
+    },
 }
+DATABASE_ROUTERS = ['myapp.snapshot.SnapshotRouter']
+
+# Read snapshot: the refresh_snapshot command copies the database this often
+# (0 turns snapshot reads off). Views choose their own staleness with
+# @use_snapshot(max_age=...), capped at SNAPSHOT_MAX_AGE seconds.
+SNAPSHOT_REFRESH_SECONDS = 30
+SNAPSHOT_MAX_AGE = 5 * 60
+
 # DATABASES = {
 #     'default': {
 #         'ENGINE': 'django.db.backends.mysql',
@@ -98,6 +193,29 @@ DATABASES = {
 #     }
 # }
 
+# Sessions and caching
+# Sessions live in a signed cookie: every worker (and host) reads the same state
+# with no django_session query and no shared cache to keep in step. The session
+# holds only the login and flash messages, well under the 4 KB cookie limit.
+# Signed is not encrypted, so never put secrets in request.session; a copied
+# cookie stays valid until it expires (SESSION_COOKIE_AGE), though a password
+# change still ends it. Switching engines logged out existing database sessions.
+SESSION_ENGINE = 'django.contrib.sessions.backends.signed_cookies'
+# The cache only holds per-worker hints (download hit counts in myapp/downloads.py).
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'vetri-designs',
+    }
+}
+
+# ProfileModelBackend joins Profile onto request.user; ModelBackend stays listed so
+# sessions created before the switch remain valid.
+AUTHENTICATION_BACKENDS = [
+    'myapp.backends.ProfileModelBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -137,13 +255,27 @@ STATIC_URL = '/static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 STATICFILES_DIRS = [BASE_DIR / 'static']  # Only needed if you have a local /static folder
 
-# WhiteNoise for serving static files
-STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
+# WhiteNoise for serving static files. STATICFILES_STORAGE is ignored since
+# Django 5.1, so the storage has to be configured through STORAGES.
+# `collectstatic` minifies myapp's page CSS/JS, then hashes and compresses them.
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "myapp.storage.MinifiedManifestStaticFilesStorage",
+    },
+}
 
 # Media files
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Project image ZIP downloads (myapp/downloads.py): an archive is built into this
+# directory once it has been requested DOWNLOAD_CACHE_MIN_HITS times.
+DOWNLOAD_CACHE_DIR = MEDIA_ROOT / 'cache' / 'downloads'
+DOWNLOAD_CACHE_MIN_HITS = 2
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 